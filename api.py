@@ -1,81 +1,360 @@
 import os
-from datetime import datetime, timezone
-from flask import Flask, jsonify, send_from_directory, request
+import gzip
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, Optional
+from flask import Flask, Response, jsonify, send_from_directory, request, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
-from helpers.types import DatabaseConfig
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DESCENDING
+from pymongo.collection import Collection
+from helpers.types import DatabaseConfig, HistoryQueryConfig
+from helpers.static_assets import HashedAssetManifest
+from helpers.history_query import (
+  resolve_timezone,
+  day_bounds,
+  parse_range_bound,
+  encode_cursor,
+  decode_cursor,
+  encode_stream_cursor,
+  decode_stream_cursor,
+  build_recommendation_filter,
+  build_history_query
+)
+from helpers.llm_record_storage import (
+  HOLDINGS_SNAPSHOTS_TABLE,
+  LARGE_TEXT_FIELDS,
+  get_prompt_response,
+  reconstruct_prompt
+)
 from database.mongo_database import MongoDatabase
+from database.record_tailer import RecordTailer
 
 load_dotenv()
 
-app = Flask(__name__, static_folder='dashboard', static_url_path='')
+logger = logging.getLogger(__name__)
+
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+STREAM_POLL_INTERVAL = float(os.getenv('STREAM_POLL_INTERVAL', '5'))
+STREAM_HEARTBEAT_INTERVAL = float(os.getenv('STREAM_HEARTBEAT_INTERVAL', '15'))
+STREAM_LOOKBACK_SECONDS = float(os.getenv('STREAM_LOOKBACK_SECONDS', '60'))
+STREAM_RETRY_MS = 5000
+# Each open stream holds a server thread for its whole life, so streams are capped per
+# process to leave threads for regular API requests (see gunicorn.conf.py)
+STREAM_MAX_CONNECTIONS = int(os.getenv('STREAM_MAX_CONNECTIONS', '4'))
+DASHBOARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard')
+HASHED_ASSET_MAX_AGE = 365 * 24 * 60 * 60
+STATIC_ASSET_MAX_AGE = 60 * 60
+
+# Static files are served by serve_static so content-hashed names can be resolved
+app = Flask(__name__, static_folder=None)
 # Configure CORS to allow all origins (since dashboard is served from same server, this ensures compatibility)
 CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
 
+history_query_config = HistoryQueryConfig(
+  timezone=os.getenv('API_TIMEZONE', 'Asia/Kolkata'),
+  default_page_size=int(os.getenv('API_DEFAULT_PAGE_SIZE', '50')),
+  max_page_size=int(os.getenv('API_MAX_PAGE_SIZE', '200'))
+)
+
+_mongodb_database: Optional[MongoDatabase] = None
+_mongodb_database_pid: Optional[int] = None
+_indexes_ensured = False
+_asset_manifest: Optional[HashedAssetManifest] = None
+_stream_slots = threading.BoundedSemaphore(STREAM_MAX_CONNECTIONS)
+
+def get_mongodb_database() -> MongoDatabase:
+  global _mongodb_database, _mongodb_database_pid
+  # MongoClient is not fork-safe, so every server worker process builds its own pooled client
+  if _mongodb_database is None or _mongodb_database_pid != os.getpid():
+    max_pool_size = os.getenv('MONGODB_MAX_POOL_SIZE')
+    database_config = DatabaseConfig(
+      url = os.getenv('MONGODB_URI'),
+      name = os.getenv('MONGODB_NAME'),
+      max_pool_size = int(max_pool_size) if max_pool_size else None
+    )
+    _mongodb_database = MongoDatabase(config=database_config)
+    _mongodb_database_pid = os.getpid()
+  return _mongodb_database
+
+def get_asset_manifest() -> HashedAssetManifest:
+  global _asset_manifest
+  # Rebuild on every request in debug mode so edited assets get fresh hashes
+  if _asset_manifest is None or app.debug:
+    _asset_manifest = HashedAssetManifest(DASHBOARD_DIR)
+  return _asset_manifest
+
+def get_llm_handle() -> Collection:
+  global _indexes_ensured
+  llm_handle = get_mongodb_database().get_table_handle('llm_request_responses')
+  if not _indexes_ensured:
+    # Keyset pagination walks (created_at, _id) in descending order
+    llm_handle.create_index([('created_at', DESCENDING), ('_id', DESCENDING)])
+    _indexes_ensured = True
+  return llm_handle
+
+def add_cors_headers(response):
+  response.headers.add('Access-Control-Allow-Origin', '*')
+  response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+  response.headers.add('Access-Control-Allow-Methods', 'GET,OPTIONS')
+  return response
+
+def preflight_response():
+  return add_cors_headers(jsonify({})), 200
+
+def error_response(message: str, status: int = 400):
+  return add_cors_headers(jsonify({'success': False, 'error': message})), status
+
+def attach_prompt(record: Dict[str, Any]) -> Dict[str, Any]:
+  database = get_mongodb_database()
+  try:
+    record['prompt'] = reconstruct_prompt(
+      record,
+      database.get_table_handle('feeds'),
+      database.get_table_handle(HOLDINGS_SNAPSHOTS_TABLE)
+    )
+  except ValueError as e:
+    logger.info(f"Could not rebuild prompt for {record['_id']}: {str(e)}")
+    record['prompt'] = None
+  return record
+
+def serialize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+  record['_id'] = str(record['_id'])
+  if 'prompt_response' in record:
+    record['prompt_response'] = get_prompt_response(record)
+  record.pop('prompt_response_encoding', None)
+  record.pop('prompt_compressed', None)
+  if isinstance(record.get('created_at'), datetime):
+    record['created_at'] = record['created_at'].isoformat()
+  if isinstance(record.get('updated_at'), datetime):
+    record['updated_at'] = record['updated_at'].isoformat()
+  return record
+
+def get_request_timezone():
+  return resolve_timezone(request.args.get('tz', history_query_config.timezone))
+
+def parse_flag(value: Optional[str]) -> bool:
+  return (value or '').lower() in ('1', 'true', 'yes')
+
+@app.after_request
+def compress_response(response):
+  if response.is_streamed or response.direct_passthrough or response.status_code < 200 or response.status_code >= 300:
+    return response
+  if 'Content-Encoding' in response.headers or not request.path.startswith('/api/'):
+    return response
+  if 'gzip' not in request.headers.get('Accept-Encoding', '').lower():
+    return response
+
+  payload = response.get_data()
+  if len(payload) < GZIP_MIN_SIZE:
+    return response
+
+  response.set_data(gzip.compress(payload, compresslevel=GZIP_LEVEL))
+  response.headers['Content-Encoding'] = 'gzip'
+  response.headers['Content-Length'] = str(len(response.get_data()))
+  response.vary.add('Accept-Encoding')
+  return response
+
+@app.route('/api/llm-responses', methods=['GET', 'OPTIONS'])
+def get_responses():
+  # Handle preflight requests
+  if request.method == 'OPTIONS':
+    return preflight_response()
+
+  try:
+    tz = get_request_timezone()
+    start = parse_range_bound(request.args['from'], tz) if request.args.get('from') else None
+    end = parse_range_bound(request.args['to'], tz, is_end=True) if request.args.get('to') else None
+    cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    limit = int(request.args.get('limit', history_query_config.default_page_size))
+    min_confidence = request.args.get('min_confidence')
+    recommendation_filter = build_recommendation_filter(
+      side=request.args.get('side'),
+      segment=request.args.get('segment'),
+      min_confidence=int(min_confidence) if min_confidence else None,
+      symbol=request.args.get('symbol')
+    )
+  except ValueError as e:
+    return error_response(str(e))
+
+  if limit < 1:
+    return error_response('limit must be positive')
+  limit = min(limit, history_query_config.max_page_size)
+
+  query = build_history_query(start, end, cursor, recommendation_filter, request.args.get('account'))
+  include_prompt = parse_flag(request.args.get('include_prompt'))
+
+  llm_handle = get_llm_handle()
+  records = list(
+    llm_handle.find(query, None if include_prompt else LARGE_TEXT_FIELDS)
+    .sort([('created_at', DESCENDING), ('_id', DESCENDING)])
+    .limit(limit + 1)
+  )
+
+  next_cursor = None
+  if len(records) > limit:
+    records = records[:limit]
+    last_record = records[-1]
+    next_cursor = encode_cursor(last_record['created_at'], last_record['_id'])
+  if include_prompt:
+    records = [attach_prompt(record) for record in records]
+
+  response = jsonify({
+    'success': True,
+    'count': len(records),
+    'next_cursor': next_cursor,
+    'data': [serialize_record(record) for record in records]
+  })
+  return add_cors_headers(response), 200
+
 @app.route('/api/llm-responses/today', methods=['GET', 'OPTIONS'])
 def get_today_responses():
   # Handle preflight requests
   if request.method == 'OPTIONS':
-    response = jsonify({})
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,OPTIONS')
-    return response, 200
-  database_config = DatabaseConfig(
-    url = os.getenv('MONGODB_URI'),
-    name = os.getenv('MONGODB_NAME')
-  )
-  mongodb_database = MongoDatabase(config=database_config)
-  llm_handle = mongodb_database.get_table_handle('llm_request_responses')
-  
-  now = datetime.now(timezone.utc)
-  start_of_day = datetime(now.year, now.month, now.day, 0, 0, 0, tzinfo=timezone.utc)
-  end_of_day = datetime(now.year, now.month, now.day, 23, 59, 59, 999999, tzinfo=timezone.utc)
-  
+    return preflight_response()
+
+  try:
+    tz = get_request_timezone()
+  except ValueError as e:
+    return error_response(str(e))
+
+  start_of_day, end_of_day = day_bounds(datetime.now(tz).date(), tz)
+  include_prompt = parse_flag(request.args.get('include_prompt'))
+
+  llm_handle = get_llm_handle()
   records = list(llm_handle.find({
-    'created_at': {'$gte': start_of_day, '$lte': end_of_day}
-  }).sort('created_at', -1))
-  
-  for record in records:
-    record['_id'] = str(record['_id'])
-    if 'created_at' in record:
-      record['created_at'] = record['created_at'].isoformat()
-    if 'updated_at' in record:
-      record['updated_at'] = record['updated_at'].isoformat()
-  
+    'created_at': {'$gte': start_of_day, '$lt': end_of_day}
+  }, None if include_prompt else LARGE_TEXT_FIELDS).sort([('created_at', DESCENDING), ('_id', DESCENDING)]))
+  if include_prompt:
+    records = [attach_prompt(record) for record in records]
+
+  # The stream resumes from this cursor. It lists the ids already sent from the lookback
+  # window before the newest record, so one that commits late in that window is still streamed
+  latest_record = records[0] if records else llm_handle.find_one(
+    {},
+    {'created_at': 1},
+    sort=[('created_at', DESCENDING), ('_id', DESCENDING)]
+  )
+  cursor = None
+  if latest_record:
+    window_start = latest_record['created_at'] - timedelta(seconds=STREAM_LOOKBACK_SECONDS)
+    delivered_ids = [record['_id'] for record in records if record['created_at'] >= window_start]
+    # Records from before today were not asked for, so they count as sent
+    delivered_ids += [record['_id'] for record in llm_handle.find(
+      {'created_at': {'$gte': window_start, '$lt': start_of_day}},
+      {'_id': 1}
+    )]
+    cursor = encode_stream_cursor(latest_record['created_at'], latest_record['_id'], delivered_ids)
+
   response = jsonify({
     'success': True,
     'count': len(records),
-    'data': records
+    'cursor': cursor,
+    'data': [serialize_record(record) for record in records]
   })
-  
-  # Explicitly set CORS headers
-  response.headers.add('Access-Control-Allow-Origin', '*')
-  response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-  response.headers.add('Access-Control-Allow-Methods', 'GET,OPTIONS')
-  
-  return response, 200
+  return add_cors_headers(response), 200
+
+@app.route('/api/llm-responses/<record_id>/prompt', methods=['GET', 'OPTIONS'])
+def get_record_prompt(record_id: str):
+  # Handle preflight requests
+  if request.method == 'OPTIONS':
+    return preflight_response()
+
+  try:
+    object_id = ObjectId(record_id)
+  except InvalidId:
+    return error_response('Invalid record id')
+
+  record = get_llm_handle().find_one({'_id': object_id}, {'prompt_response': 0})
+  if record is None:
+    return error_response('Record not found', 404)
+
+  attach_prompt(record)
+  if record['prompt'] is None:
+    return error_response('Prompt could not be rebuilt for this record', 404)
+  return add_cors_headers(jsonify({'success': True, '_id': record_id, 'prompt': record['prompt']})), 200
+
+def format_stream_events(tailer: RecordTailer, after, delivered_ids) -> Iterator[str]:
+  yield f'retry: {STREAM_RETRY_MS}\n\n'
+  for record in tailer.tail(after, delivered_ids):
+    if record is None:
+      yield ': keepalive\n\n'
+      continue
+    # Like the /today cursor, the event id carries the ids delivered in the lookback window
+    position, window_ids = tailer.resume_state()
+    event_id = encode_stream_cursor(position[0], position[1], window_ids)
+    payload = json.dumps(serialize_record(record), default=str)
+    yield f'id: {event_id}\nevent: llm-response\ndata: {payload}\n\n'
+
+@app.route('/api/llm-responses/stream', methods=['GET', 'OPTIONS'])
+def stream_responses():
+  # Handle preflight requests
+  if request.method == 'OPTIONS':
+    return preflight_response()
+
+  tailer = RecordTailer(
+    get_llm_handle(),
+    projection=LARGE_TEXT_FIELDS,
+    poll_interval=STREAM_POLL_INTERVAL,
+    heartbeat_interval=STREAM_HEARTBEAT_INTERVAL,
+    lookback_seconds=STREAM_LOOKBACK_SECONDS
+  )
+
+  # Browsers resend the last event id on reconnect, so nothing is missed across drops
+  last_event_id = request.headers.get('Last-Event-ID') or request.args.get('after')
+  try:
+    after, delivered_ids = decode_stream_cursor(last_event_id) if last_event_id else tailer.current_position()
+  except ValueError as e:
+    return error_response(str(e))
+
+  if not _stream_slots.acquire(blocking=False):
+    response, status = error_response('Too many live connections, try again later', 503)
+    response.headers['Retry-After'] = str(STREAM_RETRY_MS // 1000)
+    return response, status
+
+  response = Response(
+    stream_with_context(format_stream_events(tailer, after, delivered_ids)),
+    mimetype='text/event-stream'
+  )
+  # Runs when the client disconnects, even if the generator never started
+  response.call_on_close(_stream_slots.release)
+  response.headers['Cache-Control'] = 'no-cache'
+  response.headers['X-Accel-Buffering'] = 'no'
+  return add_cors_headers(response)
 
 @app.route('/')
 def index():
-  return send_from_directory('dashboard', 'index.html')
+  response = Response(get_asset_manifest().render_index(), mimetype='text/html')
+  # The page itself is always revalidated; the hashed assets it references are cached for a year
+  response.headers['Cache-Control'] = 'no-cache'
+  response.add_etag()
+  return response.make_conditional(request)
 
 @app.route('/<path:path>')
 def serve_static(path):
   # Only serve static files, not API routes
   if path.startswith('api/'):
     return jsonify({'error': 'Not found'}), 404
-  return send_from_directory('dashboard', path)
+  if path == 'index.html':
+    return index()
+
+  file_name, is_hashed = get_asset_manifest().resolve(path)
+  if not is_hashed:
+    return send_from_directory(DASHBOARD_DIR, file_name, max_age=STATIC_ASSET_MAX_AGE)
+
+  response = send_from_directory(DASHBOARD_DIR, file_name, max_age=HASHED_ASSET_MAX_AGE)
+  response.headers['Cache-Control'] = f'public, max-age={HASHED_ASSET_MAX_AGE}, immutable'
+  return response
 
 if __name__ == '__main__':
   # Get configuration from environment variables
   debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
   host = os.getenv('FLASK_HOST', '0.0.0.0')
   port = int(os.getenv('FLASK_PORT', '5000'))
-  
-  app.run(debug=debug_mode, host=host, port=port)
-
-
-
-
 
+  app.run(debug=debug_mode, host=host, port=port)
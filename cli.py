@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import argparse
+from typing import List, Optional, Dict, Any
+
+from helpers.logging_config import configure_logging
+
+# Keep this module's imports to the standard library: every stage pulls in
+# its own dependencies from main so `healthcheck` and `--help` start instantly
+
+REQUIRED_ENV_VARS = [
+  'MONGODB_URI',
+  'MONGODB_NAME',
+  'OPENAI_API_KEY',
+  'LIVEMINT_POLITICS_RSS_FEED',
+  'LIVEMINT_MARKET_RSS_FEED'
+]
+
+def run_once(args: argparse.Namespace) -> int:
+  from main import main
+  main()
+  return 0
+
+def run_daemon(args: argparse.Namespace) -> int:
+  from main import run_daemon as run_scheduled
+  run_scheduled(interval_minutes=args.interval_minutes)
+  return 0
+
+def run_ingest_only(args: argparse.Namespace) -> int:
+  from main import ingest_only
+  ingest_only()
+  return 0
+
+def run_migrate(args: argparse.Namespace) -> int:
+  from main import migrate
+  migrate()
+  return 0
+
+def run_replay(args: argparse.Namespace) -> int:
+  from main import replay
+  response_text = replay(record_id=args.id, save=args.save)
+  if response_text is None:
+    return 1
+  print(response_text)
+  return 0
+
+def check_database() -> Dict[str, Any]:
+  from pymongo import MongoClient
+
+  client = MongoClient(os.getenv('MONGODB_URI') or 'mongodb://localhost:27017/', serverSelectionTimeoutMS=3000)
+  try:
+    client.admin.command('ping')
+    return {'check': 'database', 'ok': True}
+  except Exception as e:
+    return {'check': 'database', 'ok': False, 'error': str(e)}
+  finally:
+    client.close()
+
+def check_accounts() -> Dict[str, Any]:
+  from main import get_account_configs
+
+  # Credentials come from GROWW_TOTP_* or, with GROWW_ACCOUNTS set, GROWW_TOTP_*_<ID>
+  missing = {
+    account.account_id: [name for name in ('totp_token', 'totp_secret') if not getattr(account, name)]
+    for account in get_account_configs()
+  }
+  missing = {account_id: names for account_id, names in missing.items() if names}
+  return {'check': 'groww_accounts', 'ok': not missing, 'missing': missing}
+
+def run_healthcheck(args: argparse.Namespace) -> int:
+  from main import INSTRUMENTS_PATH
+
+  results: List[Dict[str, Any]] = []
+  missing_env_vars = [name for name in REQUIRED_ENV_VARS if not os.getenv(name)]
+  results.append({'check': 'environment', 'ok': not missing_env_vars, 'missing': missing_env_vars})
+  results.append(check_accounts())
+  results.append({'check': 'instruments', 'ok': os.path.exists(INSTRUMENTS_PATH), 'path': INSTRUMENTS_PATH})
+  if args.check_db:
+    results.append(check_database())
+
+  healthy = all(result['ok'] for result in results)
+  print(json.dumps({'healthy': healthy, 'checks': results}, indent=2))
+  return 0 if healthy else 1
+
+def build_parser() -> argparse.ArgumentParser:
+  parser = argparse.ArgumentParser(prog='news-advisor', description='News Investing Advisor')
+  subparsers = parser.add_subparsers(dest='command', required=True)
+
+  run_once_parser = subparsers.add_parser('run-once', help='Run a single ingest and analysis cycle')
+  run_once_parser.set_defaults(handler=run_once)
+
+  daemon_parser = subparsers.add_parser('daemon', help='Run a cycle now and then on a schedule')
+  daemon_parser.add_argument(
+    '--interval-minutes',
+    type=int,
+    default=int(os.getenv('SCHEDULE_INTERVAL_MINUTES', '30'))
+  )
+  daemon_parser.set_defaults(handler=run_daemon)
+
+  ingest_parser = subparsers.add_parser('ingest-only', help='Store new news items without calling the LLM')
+  ingest_parser.set_defaults(handler=run_ingest_only)
+
+  migrate_parser = subparsers.add_parser('migrate', help='Migrate legacy feeds and create feed indexes')
+  migrate_parser.set_defaults(handler=run_migrate)
+
+  replay_parser = subparsers.add_parser('replay', help='Re-send a stored LLM request and print the response')
+  replay_parser.add_argument('--id', help='llm_request_responses record id (default: latest)')
+  replay_parser.add_argument('--save', action='store_true', help='Store the new response as a record')
+  replay_parser.set_defaults(handler=run_replay)
+
+  healthcheck_parser = subparsers.add_parser('healthcheck', help='Check configuration and dependencies')
+  healthcheck_parser.add_argument('--check-db', action='store_true', help='Also ping MongoDB')
+  healthcheck_parser.set_defaults(handler=run_healthcheck)
+
+  return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+  from dotenv import load_dotenv
+
+  args = build_parser().parse_args(argv)
+  load_dotenv()
+  configure_logging()
+  return args.handler(args)
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -1,21 +1,28 @@
 const API_URL = '/api/llm-responses/today';
+const STREAM_URL = '/api/llm-responses/stream';
 
-let autoRefreshInterval = null;
-let isAutoRefreshOn = false;
+let eventSource = null;
+let isLiveOn = false;
 let isLoading = false;
+let recordCount = 0;
+let renderedRecordIds = new Set();
+// Position of the newest record shown, so the stream resumes exactly where the page load ended
+let streamCursor = null;
 
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
   updateDateDisplay();
-  loadResponses();
   setupEventListeners();
+  loadResponses().then(() => setLiveUpdates(true));
 });
 
 function setupEventListeners() {
   document.getElementById('refresh-btn').addEventListener('click', () => {
     loadResponses(true);
   });
-  document.getElementById('auto-refresh-btn').addEventListener('click', toggleAutoRefresh);
+  document.getElementById('auto-refresh-btn').addEventListener('click', () => {
+    setLiveUpdates(!isLiveOn);
+  });
 }
 
 function updateDateDisplay() {
@@ -29,28 +36,79 @@ function updateDateDisplay() {
   document.getElementById('date-display').textContent = dateStr;
 }
 
-function toggleAutoRefresh() {
+function setLiveUpdates(enabled) {
   const btn = document.getElementById('auto-refresh-btn');
   const btnText = btn.querySelector('.btn-text');
-  isAutoRefreshOn = !isAutoRefreshOn;
+  isLiveOn = enabled;
 
-  if (isAutoRefreshOn) {
-    btnText.textContent = 'Auto-refresh: ON';
+  if (isLiveOn) {
+    btnText.textContent = 'Live updates: ON';
     btn.classList.add('active');
-    loadResponses(false);
-    autoRefreshInterval = setInterval(() => {
-      loadResponses(false);
-    }, 30000);
+    if (!eventSource) {
+      // EventSource reconnects on its own and resends Last-Event-ID, so no records are missed
+      const streamUrl = streamCursor ? `${STREAM_URL}?after=${encodeURIComponent(streamCursor)}` : STREAM_URL;
+      eventSource = new EventSource(streamUrl);
+      eventSource.addEventListener('llm-response', (event) => {
+        streamCursor = event.lastEventId || streamCursor;
+        appendRecord(JSON.parse(event.data));
+      });
+      eventSource.onerror = () => {
+        if (eventSource.readyState === EventSource.CLOSED) {
+          showNotification('Live updates disconnected. Click Refresh to reload.', 'error');
+        }
+      };
+    }
   } else {
-    btnText.textContent = 'Auto-refresh: OFF';
+    btnText.textContent = 'Live updates: OFF';
     btn.classList.remove('active');
-    if (autoRefreshInterval) {
-      clearInterval(autoRefreshInterval);
-      autoRefreshInterval = null;
+    if (eventSource) {
+      eventSource.close();
+      eventSource = null;
     }
   }
 }
 
+function renderEmptyState(containerEl) {
+  containerEl.innerHTML = `
+    <div class="empty-state">
+      <div class="empty-state-icon">📊</div>
+      <h2>No Recommendations Today</h2>
+      <p>There are no trading recommendations available for today.</p>
+    </div>
+  `;
+}
+
+function createRecordCards(record, recordIndex) {
+  const recommendations = parseRecommendations(record.prompt_response);
+
+  if (recommendations && recommendations.length > 0) {
+    return recommendations.map((rec, index) => createRecommendationCard(rec, recordIndex, index));
+  }
+  // If no valid recommendations, show the raw response record
+  return [createResponseRecordCard(record, recordIndex)];
+}
+
+function appendRecord(record) {
+  if (renderedRecordIds.has(record._id)) {
+    return;
+  }
+  renderedRecordIds.add(record._id);
+
+  const containerEl = document.getElementById('responses-container');
+  const emptyStateEl = containerEl.querySelector('.empty-state');
+  if (emptyStateEl) {
+    emptyStateEl.remove();
+  }
+
+  // Newest records go on top, keeping the same order as the initial load
+  const fragment = document.createDocumentFragment();
+  createRecordCards(record, recordCount).forEach((card) => fragment.appendChild(card));
+  containerEl.insertBefore(fragment, containerEl.firstChild);
+
+  recordCount += 1;
+  updateCountDisplay(recordCount);
+}
+
 async function loadResponses(isManualRefresh = false) {
   if (isLoading) {
     console.log('Request already in progress, skipping...');
@@ -81,32 +139,20 @@ async function loadResponses(isManualRefresh = false) {
       throw new Error(data.error || 'Failed to fetch responses');
     }
 
-    updateCountDisplay(data.count);
+    recordCount = data.count;
+    streamCursor = data.cursor || streamCursor;
+    renderedRecordIds = new Set(data.data.map((record) => record._id));
+    updateCountDisplay(recordCount);
     containerEl.innerHTML = '';
 
     if (data.count === 0) {
-      containerEl.innerHTML = `
-        <div class="empty-state">
-          <div class="empty-state-icon">📊</div>
-          <h2>No Recommendations Today</h2>
-          <p>There are no trading recommendations available for today.</p>
-        </div>
-      `;
+      renderEmptyState(containerEl);
     } else {
-      // Process each record
+      const fragment = document.createDocumentFragment();
       data.data.forEach((record, recordIndex) => {
-        const recommendations = parseRecommendations(record.prompt_response);
-        
-        if (recommendations && recommendations.length > 0) {
-          // Display recommendations
-          recommendations.forEach((rec, index) => {
-            containerEl.appendChild(createRecommendationCard(rec, recordIndex, index));
-          });
-        } else {
-          // If no valid recommendations, show the raw response record
-          containerEl.appendChild(createResponseRecordCard(record, recordIndex));
-        }
+        createRecordCards(record, recordIndex).forEach((card) => fragment.appendChild(card));
       });
+      containerEl.appendChild(fragment);
     }
 
     loadingEl.classList.remove('show');
@@ -114,14 +160,8 @@ async function loadResponses(isManualRefresh = false) {
   } catch (error) {
     loadingEl.classList.remove('show');
     loadingEl.style.opacity = '1';
-    
-    if (isManualRefresh || containerEl.innerHTML === '') {
-      errorEl.textContent = `Error: ${error.message}`;
-      errorEl.classList.add('show');
-    } else {
-      console.error('Auto-refresh error:', error);
-      showNotification('Auto-refresh failed. Click Refresh to try again.', 'error');
-    }
+    errorEl.textContent = `Error: ${error.message}`;
+    errorEl.classList.add('show');
   } finally {
     isLoading = false;
   }
@@ -170,9 +210,11 @@ function createRecommendationCard(recommendation, recordIndex, index) {
   const tradingIdea = recommendation.trading_idea || '';
   const newsRef = recommendation.news_summary_referenced || '';
 
-  // Determine if it's BUY or SELL
-  const isBuy = tradingIdea.toUpperCase().includes('BUY');
-  const isSell = tradingIdea.toUpperCase().includes('SELL');
+  // Determine if it's BUY or SELL: the explicit side field, else the first standalone BUY/SELL word
+  const sideMatch = tradingIdea.match(/\b(BUY|SELL)\b/i);
+  const side = String(recommendation.side || (sideMatch ? sideMatch[1] : '')).toUpperCase();
+  const isBuy = side === 'BUY';
+  const isSell = side === 'SELL';
 
   // Confidence level
   let confidenceClass = 'low';
@@ -243,7 +285,9 @@ function createResponseRecordCard(record, index) {
     </div>
     <div class="response-section">
       <div class="response-section-title">Prompt</div>
-      <div class="response-section-content">${escapeHtml(record.prompt || 'No prompt available')}</div>
+      <div class="response-section-content prompt-content">
+        <button class="btn btn-secondary load-prompt-btn">Show prompt</button>
+      </div>
     </div>
     <div class="response-section">
       <div class="response-section-title">Response</div>
@@ -251,9 +295,27 @@ function createResponseRecordCard(record, index) {
     </div>
   `;
 
+  // Prompts are rebuilt server-side, so they are only fetched when asked for
+  const promptContentEl = card.querySelector('.prompt-content');
+  card.querySelector('.load-prompt-btn').addEventListener('click', () => loadPrompt(record._id, promptContentEl));
+
   return card;
 }
 
+async function loadPrompt(recordId, promptContentEl) {
+  promptContentEl.textContent = 'Loading prompt...';
+  try {
+    const response = await fetch(`/api/llm-responses/${encodeURIComponent(recordId)}/prompt`);
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.error || 'Failed to fetch prompt');
+    }
+    promptContentEl.textContent = data.prompt || 'No prompt available';
+  } catch (error) {
+    promptContentEl.textContent = `Error: ${error.message}`;
+  }
+}
+
 function updateCountDisplay(count) {
   document.getElementById('count-display').textContent = count;
 }
@@ -0,0 +1,139 @@
+import time
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+from pymongo import InsertOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+from pymongo.operations import UpdateOne, UpdateMany, DeleteOne, DeleteMany, ReplaceOne
+from pymongo.write_concern import WriteConcern
+
+from helpers.types import BulkWriterConfig
+
+logger = logging.getLogger(__name__)
+
+WriteOperation = Union[InsertOne, UpdateOne, UpdateMany, DeleteOne, DeleteMany, ReplaceOne]
+
+@dataclass
+class _QueuedOperation:
+  operation: WriteOperation
+  future: Future
+
+@dataclass
+class _CollectionQueue:
+  handle: Collection
+  operations: List[_QueuedOperation] = field(default_factory=list)
+  oldest_enqueued_at: Optional[float] = None
+
+def _split_into_segments(queued: List[_QueuedOperation]) -> List[List[_QueuedOperation]]:
+  # Unordered bulk writes may run operations in any order, so inserts and
+  # updates are split into consecutive segments to keep update-after-insert intact
+  segments: List[List[_QueuedOperation]] = []
+  for item in queued:
+    is_insert = isinstance(item.operation, InsertOne)
+    if segments and isinstance(segments[-1][0].operation, InsertOne) == is_insert:
+      segments[-1].append(item)
+    else:
+      segments.append([item])
+  return segments
+
+class BulkWriter:
+  def __init__(self, config: Optional[BulkWriterConfig] = None):
+    self.config = config or BulkWriterConfig()
+    self.write_concern = WriteConcern(
+      w=int(self.config.write_concern_w) if self.config.write_concern_w.isdigit() else self.config.write_concern_w,
+      j=self.config.journal
+    )
+    self._queues: Dict[str, _CollectionQueue] = {}
+    self._queue_lock = threading.Lock()
+    self._flush_lock = threading.Lock()
+    self._wakeup = threading.Event()
+    self._closed = False
+    self._flusher = threading.Thread(target=self._run_flusher, name='mongo-bulk-writer', daemon=True)
+    self._flusher.start()
+    atexit.register(self.close)
+
+  def enqueue(self, table_handle: Collection, operation: WriteOperation) -> Future:
+    if self._closed:
+      raise RuntimeError('BulkWriter is closed')
+
+    future: Future = Future()
+    with self._queue_lock:
+      queue = self._queues.get(table_handle.full_name)
+      if queue is None:
+        queue = _CollectionQueue(handle=table_handle.with_options(write_concern=self.write_concern))
+        self._queues[table_handle.full_name] = queue
+      if not queue.operations:
+        queue.oldest_enqueued_at = time.monotonic()
+      queue.operations.append(_QueuedOperation(operation, future))
+      if len(queue.operations) >= self.config.max_batch_size:
+        self._wakeup.set()
+    return future
+
+  def flush(self) -> None:
+    self._flush(force=True)
+
+  def close(self) -> None:
+    if self._closed:
+      return
+    self._closed = True
+    self._wakeup.set()
+    self._flusher.join()
+    self.flush()
+    atexit.unregister(self.close)
+
+  def _run_flusher(self) -> None:
+    while not self._closed:
+      self._wakeup.wait(timeout=self.config.flush_interval)
+      self._wakeup.clear()
+      try:
+        self._flush(force=False)
+      except Exception as e:
+        logger.info(f"Background flush failed: {str(e)}")
+
+  def _take_due_queues(self, force: bool) -> List[_CollectionQueue]:
+    now = time.monotonic()
+    due: List[_CollectionQueue] = []
+    with self._queue_lock:
+      for queue in self._queues.values():
+        if not queue.operations:
+          continue
+        is_full = len(queue.operations) >= self.config.max_batch_size
+        is_stale = now - (queue.oldest_enqueued_at or now) >= self.config.flush_interval
+        if force or is_full or is_stale:
+          due.append(_CollectionQueue(handle=queue.handle, operations=queue.operations))
+          queue.operations = []
+          queue.oldest_enqueued_at = None
+    return due
+
+  def _flush(self, force: bool) -> None:
+    # A single flusher at a time keeps writes to each collection in enqueue order
+    with self._flush_lock:
+      for queue in self._take_due_queues(force):
+        for segment in _split_into_segments(queue.operations):
+          for start in range(0, len(segment), self.config.max_batch_size):
+            self._write_batch(queue.handle, segment[start:start + self.config.max_batch_size])
+
+  def _write_batch(self, table_handle: Collection, batch: List[_QueuedOperation]) -> None:
+    try:
+      table_handle.bulk_write([item.operation for item in batch], ordered=False)
+    except BulkWriteError as e:
+      failed = {error['index']: error for error in e.details.get('writeErrors', [])}
+      for index, item in enumerate(batch):
+        if index in failed:
+          item.future.set_exception(BulkWriteError({'writeErrors': [failed[index]]}))
+        else:
+          item.future.set_result(None)
+      logger.info(f"Bulk write to {table_handle.name} had {len(failed)} failed operations")
+      return
+    except Exception as e:
+      for item in batch:
+        item.future.set_exception(e)
+      logger.info(f"Bulk write to {table_handle.name} failed: {str(e)}")
+      return
+
+    for item in batch:
+      item.future.set_result(None)
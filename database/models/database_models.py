@@ -1,12 +1,19 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
+from typing import List, Dict, Any, Optional, Union
 
 
 class FeedType(Enum):
   POLITICAL = 'POLITICAL'
   MARKET = 'MARKET'
 
+class FeedStatus(Enum):
+  NEW = 'NEW'
+  LEASED = 'LEASED'
+  PROCESSED = 'PROCESSED'
+  FAILED = 'FAILED'
+
 @dataclass
 class FeedModel:
   title: str
@@ -14,12 +21,29 @@ class FeedModel:
   summary: str
   type: FeedType
   title_hash: str
-  processed: bool
+  status: FeedStatus
   published_at: datetime
+  next_attempt_at: datetime
+  attempts: int = 0
+  lease_owner: Optional[str] = None
+  lease_expires_at: Optional[datetime] = None
+  last_error: Optional[str] = None
+  skipped_by_triage: bool = False
 
 
 @dataclass
 class LLMRequestResponseModel:
-  prompt: str
-  prompt_response: str
+  # The prompt is not stored; it is rebuilt from these references (see helpers.llm_record_storage)
+  prompt_template_version: Optional[str]
+  political_title_hashes: List[str]
+  market_title_hashes: List[str]
+  holdings_snapshot_id: Optional[str]
+  prompt_response: Union[str, bytes]
+  prompt_response_encoding: Optional[str] = None
+  # Only set when the prompt cannot be rebuilt from references (e.g. unmatched legacy records)
+  prompt_compressed: Optional[bytes] = None
+  recommendations: List[Dict[str, Any]] = field(default_factory=list)
+  account_id: str = 'default'
+  # Per model tier: calls, latency, token usage and estimated cost
+  tier_metrics: Dict[str, Any] = field(default_factory=dict)
 
@@ -1,17 +1,28 @@
-from pymongo import MongoClient
+from concurrent.futures import Future
+from pymongo import MongoClient, InsertOne, UpdateMany
 from pymongo.collection import Collection
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
-from helpers.types import DatabaseConfig
+from helpers.types import DatabaseConfig, BulkWriterConfig
 from database.abstract_database import AbstractDatabase
+from database.bulk_writer import BulkWriter
 
 class MongoDatabase(AbstractDatabase):
-  def __init__(self, config: Optional[DatabaseConfig] = None):
+  def __init__(
+    self,
+    config: Optional[DatabaseConfig] = None,
+    writer_config: Optional[BulkWriterConfig] = None
+  ):
     super().__init__(config)
+    self.writer_config = writer_config
+    self.writer: Optional[BulkWriter] = None
     db_url = self.config.url or 'mongodb://localhost:27017/'
     db_name = self.config.name or 'news_investing'
-    self.client = MongoClient(db_url)
+    client_options = {}
+    if self.config.max_pool_size:
+      client_options['maxPoolSize'] = self.config.max_pool_size
+    self.client = MongoClient(db_url, **client_options)
     self.db = self.client[db_name]
 
   def get_table_handle(self, table_name: Optional[str] = None) -> Collection:
@@ -53,4 +64,43 @@ class MongoDatabase(AbstractDatabase):
       {'upsert': True}
     )
 
+  def get_bulk_writer(self) -> BulkWriter:
+    if self.writer is None:
+      self.writer = BulkWriter(self.writer_config)
+    return self.writer
+
+  def queue_record(self, table_handle: Collection, data: Dict[str, Any]) -> Future:
+    now = datetime.utcnow()
+    data['created_at'] = now
+    data['updated_at'] = now
+    return self.get_bulk_writer().enqueue(table_handle, InsertOne(data))
+
+  def queue_multiple_records(self, table_handle: Collection, records: List[Dict[str, Any]]) -> List[Future]:
+    now = datetime.utcnow()
+    futures: List[Future] = []
+    for record in records:
+      record['created_at'] = now
+      record['updated_at'] = now
+      futures.append(self.get_bulk_writer().enqueue(table_handle, InsertOne(record)))
+    return futures
+
+  def queue_update_many(
+    self,
+    table_handle: Collection,
+    query: Dict[str, Any],
+    data: Dict[str, Any]
+  ) -> Future:
+    data['updated_at'] = datetime.utcnow()
+    return self.get_bulk_writer().enqueue(table_handle, UpdateMany(query, {'$set': data}))
+
+  def flush_writes(self) -> None:
+    if self.writer is not None:
+      self.writer.flush()
+
+  def close(self) -> None:
+    if self.writer is not None:
+      self.writer.close()
+      self.writer = None
+    self.client.close()
+
 
@@ -0,0 +1,157 @@
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.collection import Collection
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+RecordKey = Tuple[datetime, ObjectId]
+
+def _record_key(record: Dict[str, Any]) -> RecordKey:
+  created_at: datetime = record['created_at']
+  if created_at.tzinfo is None:
+    created_at = created_at.replace(tzinfo=timezone.utc)
+  return created_at, record['_id']
+
+def _after_key_query(key: RecordKey) -> Dict[str, Any]:
+  created_at, record_id = key
+  return {
+    '$or': [
+      {'created_at': {'$gt': created_at}},
+      {'created_at': created_at, '_id': {'$gt': record_id}}
+    ]
+  }
+
+# Yields records inserted after a (created_at, _id) position, using a change stream
+# where the deployment supports one and polling on standalone servers. None is
+# yielded when nothing arrived within heartbeat_interval so idle streams stay open.
+#
+# created_at is stamped when a write is queued, not when it becomes visible, so a
+# record can commit after newer ones. Resuming therefore re-reads a lookback window
+# before the position and skips only the ids the client says it already has; the
+# tailer tracks the ids it delivers in that window so resume_state() can hand them on.
+class RecordTailer:
+  def __init__(
+    self,
+    collection: Collection,
+    projection: Optional[Dict[str, Any]] = None,
+    poll_interval: float = 5.0,
+    heartbeat_interval: float = 15.0,
+    lookback_seconds: float = 60.0
+  ):
+    self.collection = collection
+    self.projection = projection
+    self.poll_interval = poll_interval
+    self.heartbeat_interval = heartbeat_interval
+    self.lookback = timedelta(seconds=lookback_seconds)
+    self.position: Optional[RecordKey] = None
+    self.delivered: Dict[ObjectId, datetime] = {}
+
+  def latest_key(self) -> Optional[RecordKey]:
+    latest = self.collection.find_one(
+      {},
+      {'created_at': 1},
+      sort=[('created_at', DESCENDING), ('_id', DESCENDING)]
+    )
+    return _record_key(latest) if latest else None
+
+  def current_position(self) -> Tuple[Optional[RecordKey], List[ObjectId]]:
+    # Starting from now means everything already visible counts as delivered
+    latest = self.latest_key()
+    if latest is None:
+      return None, []
+    window = self._fetch_since(latest[0] - self.lookback, {'created_at': 1})
+    return latest, [record['_id'] for record in window if _record_key(record) <= latest]
+
+  def resume_state(self) -> Tuple[Optional[RecordKey], List[ObjectId]]:
+    return self.position, list(self.delivered)
+
+  def _fetch_after(self, key: Optional[RecordKey]) -> List[Dict[str, Any]]:
+    query = _after_key_query(key) if key else {}
+    return list(
+      self.collection.find(query, self.projection)
+      .sort([('created_at', ASCENDING), ('_id', ASCENDING)])
+    )
+
+  def _fetch_since(self, since: datetime, projection: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return list(
+      self.collection.find({'created_at': {'$gte': since}}, projection)
+      .sort([('created_at', ASCENDING), ('_id', ASCENDING)])
+    )
+
+  def _fetch_window(self) -> List[Dict[str, Any]]:
+    if self.position is None:
+      return self._fetch_after(None)
+    return self._fetch_since(self.position[0] - self.lookback, self.projection)
+
+  def _project(self, document: Dict[str, Any]) -> Dict[str, Any]:
+    if not self.projection:
+      return document
+    excluded = {name for name, include in self.projection.items() if not include}
+    return {name: value for name, value in document.items() if name not in excluded}
+
+  def _deliver(self, record: Dict[str, Any]) -> bool:
+    if record['_id'] in self.delivered:
+      return False
+    key = _record_key(record)
+    self.delivered[record['_id']] = key[0]
+    if self.position is None or key > self.position:
+      self.position = key
+      # Anything older than the window is never re-read, so its id can be forgotten
+      cutoff = key[0] - self.lookback
+      self.delivered = {record_id: created_at for record_id, created_at in self.delivered.items() if created_at >= cutoff}
+    return True
+
+  def tail(
+    self,
+    after: Optional[RecordKey] = None,
+    delivered_ids: Iterable[ObjectId] = ()
+  ) -> Iterator[Optional[Dict[str, Any]]]:
+    self.position = after
+    self.delivered = {delivered_id: after[0] for delivered_id in delivered_ids} if after else {}
+
+    try:
+      change_stream = self.collection.watch(
+        [{'$match': {'operationType': 'insert'}}],
+        max_await_time_ms=int(self.heartbeat_interval * 1000)
+      )
+    except OperationFailure as e:
+      logger.info(f"Change streams unavailable ({e}), falling back to polling")
+      yield from self._poll()
+      return
+
+    with change_stream:
+      # The stream is opened before catching up so inserts in between are not lost;
+      # those inserts show up in both and are skipped the second time
+      for record in self._fetch_window():
+        if self._deliver(record):
+          yield record
+
+      while change_stream.alive:
+        change = change_stream.try_next()
+        if change is None:
+          yield None
+          continue
+        record = self._project(change['fullDocument'])
+        if self._deliver(record):
+          yield record
+
+  def _poll(self) -> Iterator[Optional[Dict[str, Any]]]:
+    last_yield = time.monotonic()
+    while True:
+      yielded = False
+      for record in self._fetch_window():
+        if self._deliver(record):
+          yielded = True
+          yield record
+
+      if yielded:
+        last_yield = time.monotonic()
+      elif time.monotonic() - last_yield >= self.heartbeat_interval:
+        last_yield = time.monotonic()
+        yield None
+      time.sleep(self.poll_interval)
@@ -0,0 +1,24 @@
+import os
+import multiprocessing
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5000')}"
+workers = int(os.getenv('API_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+worker_class = 'gthread'
+threads = int(os.getenv('API_THREADS', '8'))
+# Every open SSE stream holds one of these threads until the client disconnects.
+# api.py caps streams per worker at half the threads, so the rest keep serving
+# regular requests; extra stream clients get a 503 instead of starving the API.
+os.environ.setdefault('STREAM_MAX_CONNECTIONS', str(max(1, threads // 2)))
+# Each worker builds its own MongoClient after fork; size its pool to the thread count
+os.environ.setdefault('MONGODB_MAX_POOL_SIZE', str(threads))
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+max_requests = int(os.getenv('API_MAX_REQUESTS', '10000'))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('API_LOG_LEVEL', 'info')
@@ -1,10 +1,12 @@
 import hashlib
+from concurrent.futures import Future
 from typing import List, Dict, Any
 from dataclasses import asdict
+from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from pymongo.collection import Collection
 
-from database.models.database_models import FeedModel, FeedType
+from database.models.database_models import FeedModel, FeedType, FeedStatus
 from database.mongo_database import MongoDatabase
 from helpers.types import RSSFeedEntry
 
@@ -19,37 +21,35 @@ def _create_feed_model(feed: RSSFeedEntry, feed_type: FeedType, title_hash: str)
     summary=feed['summary'],
     type=feed_type,
     title_hash=title_hash,
-    processed=False,
+    status=FeedStatus.NEW,
     published_at=published_datetime,
+    next_attempt_at=datetime.now(timezone.utc),
   )
 
-def filter_unprocessed_feeds(
+def store_new_feeds(
   parsed_feeds: List[RSSFeedEntry],
   feed_type: FeedType,
   feed_table_handle: Collection,
   mongodb_database: MongoDatabase
-) -> List[RSSFeedEntry]:
+) -> List[Future]:
   if not parsed_feeds:
     return []
-  
+
   title_hashes = [_calculate_title_hash(feed['title']) for feed in parsed_feeds]
-  existing_feeds = feed_table_handle.find({'title_hash': {'$in': title_hashes}})
+  existing_feeds = feed_table_handle.find({'title_hash': {'$in': title_hashes}}, {'title_hash': 1})
   existing_hashes = {doc['title_hash'] for doc in existing_feeds}
-  
-  new_feeds: List[RSSFeedEntry] = []
+
   feed_dicts: List[Dict[str, Any]] = []
-  
-  for feed in parsed_feeds:
-    title_hash = _calculate_title_hash(feed['title'])
+
+  for feed, title_hash in zip(parsed_feeds, title_hashes):
     if title_hash not in existing_hashes:
+      existing_hashes.add(title_hash)
       feed_model = _create_feed_model(feed, feed_type, title_hash)
       feed_dict = asdict(feed_model)
       feed_dict['type'] = feed_dict['type'].value
+      feed_dict['status'] = feed_dict['status'].value
       feed_dicts.append(feed_dict)
-      new_feeds.append(feed)
-
-  if feed_dicts:
-    mongodb_database.save_multiple_records(feed_table_handle, feed_dicts)
-
-  return new_feeds
 
+  # New feeds enter the lease queue as NEW; the unique title_hash index drops
+  # copies inserted concurrently by another worker
+  return mongodb_database.queue_multiple_records(feed_table_handle, feed_dicts)
@@ -0,0 +1,214 @@
+import os
+import uuid
+import socket
+import random
+import logging
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List, Dict, Any, Optional
+from pymongo import ASCENDING, ReturnDocument, UpdateMany
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from database.models.database_models import FeedStatus
+from database.mongo_database import MongoDatabase
+from helpers.types import FeedLeaseConfig, RSSFeedEntry
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+
+def create_worker_id() -> str:
+  return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+def prepare_feed_collection(feed_table_handle: Collection) -> None:
+  # One-off setup run by `cli migrate` and `cli ingest-only`, not on every cycle.
+  # Feeds stored before the state machine only carry a processed flag
+  now = datetime.now(timezone.utc)
+  feed_table_handle.update_many(
+    {'status': {'$exists': False}, 'processed': True},
+    {'$set': {'status': FeedStatus.PROCESSED.value}, '$unset': {'processed': ''}}
+  )
+  feed_table_handle.update_many(
+    {'status': {'$exists': False}},
+    {
+      '$set': {'status': FeedStatus.NEW.value, 'next_attempt_at': now, 'attempts': 0},
+      '$unset': {'processed': ''}
+    }
+  )
+
+  feed_table_handle.create_index([('status', ASCENDING), ('next_attempt_at', ASCENDING)])
+  feed_table_handle.create_index([('status', ASCENDING), ('lease_expires_at', ASCENDING)])
+  try:
+    feed_table_handle.create_index('title_hash', unique=True)
+  except OperationFailure as e:
+    logger.info(f"Could not create unique title_hash index, duplicates may exist: {str(e)}")
+
+def wait_for_feed_inserts(insert_futures: List[Future]) -> None:
+  for future in insert_futures:
+    try:
+      future.result()
+    except BulkWriteError as e:
+      write_errors = e.details.get('writeErrors', [])
+      if any(error.get('code') != DUPLICATE_KEY_ERROR for error in write_errors):
+        raise
+
+def fail_exhausted_leases(
+  feed_table_handle: Collection,
+  config: FeedLeaseConfig,
+  now: datetime
+) -> None:
+  # A worker that crashed on an item's last attempt leaves a lease no one may reclaim
+  feed_table_handle.update_many(
+    {
+      'status': FeedStatus.LEASED.value,
+      'lease_expires_at': {'$lte': now},
+      'attempts': {'$gte': config.max_attempts}
+    },
+    {
+      '$set': {
+        'status': FeedStatus.FAILED.value,
+        'lease_owner': None,
+        'lease_expires_at': None,
+        'last_error': 'Lease expired on the final attempt',
+        'updated_at': now
+      }
+    }
+  )
+
+def claim_feeds(
+  feed_table_handle: Collection,
+  worker_id: str,
+  config: FeedLeaseConfig
+) -> List[Dict[str, Any]]:
+  now = datetime.now(timezone.utc)
+  fail_exhausted_leases(feed_table_handle, config, now)
+  claim_query = {
+    '$or': [
+      {
+        'status': {'$in': [FeedStatus.NEW.value, FeedStatus.FAILED.value]},
+        'next_attempt_at': {'$lte': now}
+      },
+      # Leases left behind by crashed workers become claimable once they expire
+      {'status': FeedStatus.LEASED.value, 'lease_expires_at': {'$lte': now}}
+    ],
+    'attempts': {'$lt': config.max_attempts},
+    'published_at': {'$gte': now - timedelta(hours=config.max_feed_age_hours)}
+  }
+  lease_update = {
+    '$set': {
+      'status': FeedStatus.LEASED.value,
+      'lease_owner': worker_id,
+      'lease_expires_at': now + timedelta(seconds=config.lease_seconds),
+      'updated_at': now
+    },
+    '$inc': {'attempts': 1}
+  }
+
+  claimed: List[Dict[str, Any]] = []
+  while len(claimed) < config.batch_size:
+    feed = feed_table_handle.find_one_and_update(
+      claim_query,
+      lease_update,
+      sort=[('next_attempt_at', ASCENDING)],
+      return_document=ReturnDocument.AFTER
+    )
+    if feed is None:
+      break
+    claimed.append(feed)
+  return claimed
+
+def complete_feeds(
+  claimed_feeds: List[Dict[str, Any]],
+  feed_table_handle: Collection,
+  mongodb_database: MongoDatabase,
+  worker_id: str,
+  skipped_by_triage: bool = False
+) -> Optional[Future]:
+  if not claimed_feeds:
+    return None
+  return mongodb_database.queue_update_many(
+    feed_table_handle,
+    {
+      'title_hash': {'$in': [feed['title_hash'] for feed in claimed_feeds]},
+      'status': FeedStatus.LEASED.value,
+      'lease_owner': worker_id
+    },
+    {
+      'status': FeedStatus.PROCESSED.value,
+      'lease_owner': None,
+      'lease_expires_at': None,
+      'last_error': None,
+      'skipped_by_triage': skipped_by_triage
+    }
+  )
+
+def record_account_progress(
+  title_hashes: List[str],
+  account_id: str,
+  feed_table_handle: Collection,
+  mongodb_database: MongoDatabase
+) -> Future:
+  # Retried feeds skip the accounts that already produced a recommendation for them
+  return mongodb_database.get_bulk_writer().enqueue(
+    feed_table_handle,
+    UpdateMany(
+      {'title_hash': {'$in': title_hashes}},
+      {'$addToSet': {'processed_accounts': account_id}}
+    )
+  )
+
+def feeds_pending_for_account(claimed_feeds: List[Dict[str, Any]], account_id: str) -> List[Dict[str, Any]]:
+  return [
+    feed for feed in claimed_feeds
+    if account_id not in feed.get('processed_accounts', [])
+  ]
+
+def _retry_delay(attempts: int, config: FeedLeaseConfig) -> float:
+  delay = min(config.retry_max_delay_seconds, config.retry_base_delay_seconds * 2 ** max(attempts - 1, 0))
+  return delay * random.uniform(0.5, 1.0)
+
+def fail_feeds(
+  claimed_feeds: List[Dict[str, Any]],
+  feed_table_handle: Collection,
+  mongodb_database: MongoDatabase,
+  worker_id: str,
+  error: str,
+  config: FeedLeaseConfig
+) -> List[Future]:
+  now = datetime.now(timezone.utc)
+  feeds_by_attempts: Dict[int, List[str]] = {}
+  for feed in claimed_feeds:
+    feeds_by_attempts.setdefault(feed['attempts'], []).append(feed['title_hash'])
+
+  # Feeds that used their last attempt stay FAILED and are no longer claimed
+  futures: List[Future] = []
+  for attempts, title_hashes in feeds_by_attempts.items():
+    futures.append(mongodb_database.queue_update_many(
+      feed_table_handle,
+      {
+        'title_hash': {'$in': title_hashes},
+        'status': FeedStatus.LEASED.value,
+        'lease_owner': worker_id
+      },
+      {
+        'status': FeedStatus.FAILED.value,
+        'lease_owner': None,
+        'lease_expires_at': None,
+        'next_attempt_at': now + timedelta(seconds=_retry_delay(attempts, config)),
+        'last_error': error
+      }
+    ))
+  return futures
+
+def feed_document_to_entry(feed: Dict[str, Any]) -> RSSFeedEntry:
+  published_at: datetime = feed['published_at']
+  if published_at.tzinfo is None:
+    published_at = published_at.replace(tzinfo=timezone.utc)
+  return {
+    'title': feed['title'],
+    'link': feed['link'],
+    'published': format_datetime(published_at),
+    'summary': feed['summary']
+  }
@@ -1,9 +1,6 @@
 import pyotp
-from dotenv import load_dotenv
 from growwapi import GrowwAPI
 
-load_dotenv()
-
 def generate_groww_access_token(totp_token: str, totp_secret: str) -> str:
   totp_gen = pyotp.TOTP(totp_secret)
   totp = totp_gen.now()
@@ -0,0 +1,145 @@
+import re
+import base64
+from datetime import datetime, date, time, timedelta, timezone, tzinfo
+from typing import Dict, Any, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from bson import ObjectId
+from bson.errors import InvalidId
+
+SEGMENT_ALIASES = {
+  'MARKET': 'MARKET_NEWS',
+  'MARKET_NEWS': 'MARKET_NEWS',
+  'POLITICAL': 'POLITICAL_NEWS',
+  'POLITICAL_NEWS': 'POLITICAL_NEWS'
+}
+SIDES = {'BUY', 'SELL'}
+STREAM_CURSOR_SEPARATOR = '~'
+DEFAULT_ACCOUNT_ID = 'default'
+
+def resolve_timezone(name: str) -> tzinfo:
+  try:
+    return ZoneInfo(name)
+  except (ZoneInfoNotFoundError, ValueError):
+    raise ValueError(f'Unknown timezone: {name}')
+
+def day_bounds(day: date, tz: tzinfo) -> Tuple[datetime, datetime]:
+  start = datetime.combine(day, time.min, tzinfo=tz)
+  end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+  return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+def parse_range_bound(value: str, tz: tzinfo, is_end: bool = False) -> datetime:
+  # Plain dates cover the whole local day, so an end date is exclusive of the following midnight
+  try:
+    day = date.fromisoformat(value)
+  except ValueError:
+    day = None
+  if day is not None:
+    start, end = day_bounds(day, tz)
+    return end if is_end else start
+
+  try:
+    moment = datetime.fromisoformat(value)
+  except ValueError:
+    raise ValueError(f'Invalid date or datetime: {value}')
+  if moment.tzinfo is None:
+    moment = moment.replace(tzinfo=tz)
+  return moment.astimezone(timezone.utc)
+
+def encode_cursor(created_at: datetime, record_id: ObjectId) -> str:
+  if created_at.tzinfo is not None:
+    created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+  raw = f'{created_at.isoformat()}|{record_id}'
+  return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+  try:
+    padded = cursor + '=' * (-len(cursor) % 4)
+    created_at_raw, record_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+    created_at = datetime.fromisoformat(created_at_raw).replace(tzinfo=timezone.utc)
+    return created_at, ObjectId(record_id)
+  except (ValueError, InvalidId, UnicodeDecodeError):
+    raise ValueError('Invalid cursor')
+
+def encode_stream_cursor(created_at: datetime, record_id: ObjectId, delivered_ids: List[ObjectId]) -> str:
+  # A position plus the ids the client already has from just before it, so records
+  # that commit late inside that window are still sent instead of skipped
+  return STREAM_CURSOR_SEPARATOR.join([encode_cursor(created_at, record_id)] + [str(delivered_id) for delivered_id in delivered_ids])
+
+def decode_stream_cursor(cursor: str) -> Tuple[Tuple[datetime, ObjectId], List[ObjectId]]:
+  position, *delivered_ids = cursor.split(STREAM_CURSOR_SEPARATOR)
+  try:
+    return decode_cursor(position), [ObjectId(delivered_id) for delivered_id in delivered_ids]
+  except InvalidId:
+    raise ValueError('Invalid cursor')
+
+def build_recommendation_filter(
+  side: Optional[str] = None,
+  segment: Optional[str] = None,
+  min_confidence: Optional[int] = None,
+  symbol: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+  element_match: Dict[str, Any] = {}
+
+  if side:
+    side = side.upper()
+    if side not in SIDES:
+      raise ValueError(f'Invalid side: {side}')
+    element_match['side'] = side
+
+  if segment:
+    normalized_segment = SEGMENT_ALIASES.get(segment.upper())
+    if not normalized_segment:
+      raise ValueError(f'Invalid segment: {segment}')
+    element_match['news_summary_segment'] = normalized_segment
+
+  if min_confidence is not None:
+    element_match['confidence_on_trading_idea'] = {'$gte': min_confidence}
+
+  if symbol:
+    element_match['trading_idea'] = {'$regex': re.escape(symbol), '$options': 'i'}
+
+  if not element_match:
+    return None
+  # $elemMatch keeps every condition on the same recommendation
+  return {'recommendations': {'$elemMatch': element_match}}
+
+def build_history_query(
+  start: Optional[datetime] = None,
+  end: Optional[datetime] = None,
+  cursor: Optional[Tuple[datetime, ObjectId]] = None,
+  recommendation_filter: Optional[Dict[str, Any]] = None,
+  account_id: Optional[str] = None
+) -> Dict[str, Any]:
+  conditions: List[Dict[str, Any]] = []
+
+  if account_id == DEFAULT_ACCOUNT_ID:
+    # Records saved before multi-account support have no account_id
+    conditions.append({'account_id': {'$in': [DEFAULT_ACCOUNT_ID, None]}})
+  elif account_id:
+    conditions.append({'account_id': account_id})
+
+  created_at_range: Dict[str, Any] = {}
+  if start:
+    created_at_range['$gte'] = start
+  if end:
+    created_at_range['$lt'] = end
+  if created_at_range:
+    conditions.append({'created_at': created_at_range})
+
+  if cursor:
+    cursor_created_at, cursor_id = cursor
+    conditions.append({
+      '$or': [
+        {'created_at': {'$lt': cursor_created_at}},
+        {'created_at': cursor_created_at, '_id': {'$lt': cursor_id}}
+      ]
+    })
+
+  if recommendation_filter:
+    conditions.append(recommendation_filter)
+
+  if not conditions:
+    return {}
+  if len(conditions) == 1:
+    return conditions[0]
+  return {'$and': conditions}
@@ -0,0 +1,96 @@
+import json
+import zlib
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
+
+from database.models.database_models import FeedType
+from helpers.types import PortfolioHolding, ResultantLLMInputPayload
+from helpers.feed_leasing import feed_document_to_entry
+from prompts.news_based_prompt import PROMPT_TEMPLATE_VERSION, generate_news_based_prompt
+
+COMPRESSION_ENCODING = 'zlib'
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_LEVEL = 9
+HOLDINGS_SNAPSHOTS_TABLE = 'holdings_snapshots'
+# Fields that can be rebuilt or decompressed on demand and are left out of listings
+LARGE_TEXT_FIELDS = {'prompt': 0, 'prompt_compressed': 0}
+
+LEGACY_PROMPT_TEMPLATE_VERSION = 'news-v1'
+PROMPT_TEMPLATES: Dict[str, Callable[[ResultantLLMInputPayload], str]] = {
+  LEGACY_PROMPT_TEMPLATE_VERSION: lambda payload: generate_news_based_prompt(payload, include_side=False),
+  PROMPT_TEMPLATE_VERSION: generate_news_based_prompt
+}
+
+def compress_text(text: str) -> Tuple[Union[str, bytes], Optional[str]]:
+  encoded = text.encode('utf-8')
+  if len(encoded) < COMPRESSION_MIN_SIZE:
+    return text, None
+  return zlib.compress(encoded, COMPRESSION_LEVEL), COMPRESSION_ENCODING
+
+def compress_prompt(prompt: str) -> bytes:
+  return zlib.compress(prompt.encode('utf-8'), COMPRESSION_LEVEL)
+
+def decompress_text(value: Union[str, bytes, None], encoding: Optional[str]) -> Optional[str]:
+  if value is None or encoding is None:
+    return value
+  if encoding != COMPRESSION_ENCODING:
+    raise ValueError(f'Unsupported text encoding: {encoding}')
+  return zlib.decompress(bytes(value)).decode('utf-8')
+
+def get_prompt_response(record: Dict[str, Any]) -> str:
+  return decompress_text(record.get('prompt_response'), record.get('prompt_response_encoding')) or ''
+
+def holdings_snapshot_id(holdings: List[PortfolioHolding]) -> str:
+  canonical = json.dumps(holdings, sort_keys=True, separators=(',', ':'), default=str)
+  return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def build_holdings_snapshot(holdings: List[PortfolioHolding]) -> Dict[str, Any]:
+  # Content-addressed, so identical portfolios across cycles and records share one document
+  return {'_id': holdings_snapshot_id(holdings), 'holdings': holdings}
+
+def reconstruct_prompt(
+  record: Dict[str, Any],
+  feed_table_handle: Any,
+  holdings_snapshot_handle: Any
+) -> str:
+  if record.get('prompt') is not None:
+    return record['prompt']
+  if record.get('prompt_compressed') is not None:
+    return decompress_text(record['prompt_compressed'], COMPRESSION_ENCODING)
+
+  template_version = record.get('prompt_template_version')
+  generate_prompt = PROMPT_TEMPLATES.get(template_version)
+  if generate_prompt is None:
+    raise ValueError(f'Unknown prompt template version: {template_version}')
+
+  political_title_hashes: List[str] = record.get('political_title_hashes', [])
+  market_title_hashes: List[str] = record.get('market_title_hashes', [])
+  feeds_by_hash = {
+    feed['title_hash']: feed
+    for feed in feed_table_handle.find({'title_hash': {'$in': political_title_hashes + market_title_hashes}})
+  }
+  missing_hashes = [
+    title_hash for title_hash in political_title_hashes + market_title_hashes
+    if title_hash not in feeds_by_hash
+  ]
+  if missing_hashes:
+    raise ValueError(f'Feeds referenced by the record are missing: {missing_hashes}')
+
+  holdings: List[PortfolioHolding] = []
+  if record.get('holdings_snapshot_id'):
+    snapshot = holdings_snapshot_handle.find_one({'_id': record['holdings_snapshot_id']})
+    if snapshot is None:
+      raise ValueError(f"Holdings snapshot {record['holdings_snapshot_id']} is missing")
+    holdings = snapshot['holdings']
+
+  payload: ResultantLLMInputPayload = {
+    'current_portfolio_holdings': holdings,
+    'political_news': [feed_document_to_entry(feeds_by_hash[title_hash]) for title_hash in political_title_hashes],
+    'market_news': [feed_document_to_entry(feeds_by_hash[title_hash]) for title_hash in market_title_hashes]
+  }
+  return generate_prompt(payload)
+
+def split_title_hashes(feeds: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+  political_title_hashes = [feed['title_hash'] for feed in feeds if feed['type'] == FeedType.POLITICAL.value]
+  market_title_hashes = [feed['title_hash'] for feed in feeds if feed['type'] != FeedType.POLITICAL.value]
+  return political_title_hashes, market_title_hashes
@@ -0,0 +1,8 @@
+import logging
+
+def configure_logging(level: int = logging.INFO) -> None:
+  logging.basicConfig(
+    level=level,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+  )
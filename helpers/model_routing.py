@@ -0,0 +1,144 @@
+import os
+import re
+import json
+import time
+import logging
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from helpers.types import ModelRoutingConfig, ModelTierConfig, TierMetrics
+
+logger = logging.getLogger(__name__)
+
+OPENAI_RATE_LIMIT_PER_SECOND = 5
+TRIAGE_MODES = ('model', 'heuristic', 'off')
+TRIAGE_SYSTEM_PROMPT = (
+  'You screen news items for an equity trading desk. '
+  'An item is actionable only if it could plausibly move the price of a specific listed company, sector, '
+  'index, commodity or currency. Return ONLY a JSON array of the actionable item numbers.'
+)
+# Used when the triage tier is the local heuristic rather than a model
+ACTIONABLE_KEYWORDS = re.compile(
+  r'\b(shares?|stocks?|sensex|nifty|ipo|earnings|profits?|loss(es)?|revenue|results|quarter|q[1-4]|'
+  r'dividend|buyback|stake|merger|acquisitions?|deal|orders?|contract|rbi|repo rate|interest rates?|'
+  r'inflation|gdp|tariffs?|duty|taxe?s?|gst|budget|subsid(y|ies)|sanctions?|crude|oil|gold|rupee|'
+  r'fii|fpi|rally|slump|crash|downgrade|upgrade|rating|ban|regulat\w*|sebi|policy)\b',
+  re.IGNORECASE
+)
+
+def empty_tier_metrics(tier: ModelTierConfig) -> TierMetrics:
+  return {
+    'model': tier.model,
+    'calls': 0,
+    'latency_seconds': 0.0,
+    'prompt_tokens': 0,
+    'completion_tokens': 0,
+    'estimated_cost_usd': 0.0
+  }
+
+def record_usage(metrics: TierMetrics, tier: ModelTierConfig, latency_seconds: float, usage: Any) -> None:
+  prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+  completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+  metrics['calls'] += 1
+  metrics['latency_seconds'] += latency_seconds
+  metrics['prompt_tokens'] += prompt_tokens
+  metrics['completion_tokens'] += completion_tokens
+  metrics['estimated_cost_usd'] += (
+    prompt_tokens * tier.input_price_per_million + completion_tokens * tier.output_price_per_million
+  ) / 1_000_000
+
+def is_retryable_openai_error(error: Exception) -> bool:
+  import openai
+  return isinstance(error, (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError
+  ))
+
+def request_chat_completion(
+  routing_config: ModelRoutingConfig,
+  tier: ModelTierConfig,
+  system_prompt: str,
+  user_prompt: str
+) -> Tuple[str, TierMetrics]:
+  from openai import OpenAI
+  from helpers.resilience import get_resilient_client
+
+  # Retries are owned by the resilience layer so they share its budget and circuit breaker
+  llm_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'), base_url=routing_config.base_url, max_retries=0)
+  resilient_client = get_resilient_client('openai', OPENAI_RATE_LIMIT_PER_SECOND)
+  metrics = empty_tier_metrics(tier)
+  started = time.perf_counter()
+  llm_response = resilient_client.call(
+    lambda: llm_client.chat.completions.create(
+      model=tier.model,
+      messages=[
+        {
+          'role': 'system',
+          'content': system_prompt
+        },
+        {
+          'role': 'user',
+          'content': user_prompt
+        }
+      ]
+    ),
+    is_retryable=is_retryable_openai_error
+  )
+  record_usage(metrics, tier, time.perf_counter() - started, llm_response.usage)
+  return llm_response.choices[0].message.content or "", metrics
+
+def build_triage_prompt(feeds: List[Dict[str, Any]]) -> str:
+  lines = ['NEWS ITEMS:', '']
+  for index, feed in enumerate(feeds, 1):
+    lines.append(f"{index}. [{feed['type']}] {feed['title']} - {feed['summary']}")
+  lines.append('')
+  lines.append('Return ONLY a JSON array of the numbers of the actionable items, e.g. [1, 4]. Return [] if none are.')
+  return '\n'.join(lines)
+
+def parse_triage_response(response_text: str, item_count: int) -> Optional[Set[int]]:
+  match = re.search(r'\[[\d\s,]*\]', response_text)
+  if not match:
+    return None
+  try:
+    numbers = json.loads(match.group(0))
+  except json.JSONDecodeError:
+    return None
+  return {number - 1 for number in numbers if isinstance(number, int) and 1 <= number <= item_count}
+
+def is_actionable_by_heuristic(feed: Dict[str, Any]) -> bool:
+  return bool(ACTIONABLE_KEYWORDS.search(f"{feed['title']} {feed['summary']}"))
+
+def triage_feeds(
+  feeds: List[Dict[str, Any]],
+  routing_config: ModelRoutingConfig
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], TierMetrics]:
+  metrics = empty_tier_metrics(routing_config.triage)
+  if routing_config.triage_mode == 'off' or not feeds:
+    return feeds, [], metrics
+
+  if routing_config.triage_mode == 'heuristic':
+    metrics['model'] = 'heuristic'
+    started = time.perf_counter()
+    actionable_indexes = {index for index, feed in enumerate(feeds) if is_actionable_by_heuristic(feed)}
+    metrics['calls'] = 1
+    metrics['latency_seconds'] = time.perf_counter() - started
+  else:
+    # A failed or unreadable triage lets every item through rather than dropping news
+    try:
+      response_text, metrics = request_chat_completion(
+        routing_config,
+        routing_config.triage,
+        TRIAGE_SYSTEM_PROMPT,
+        build_triage_prompt(feeds)
+      )
+    except Exception as e:
+      logger.info(f"News triage failed ({str(e)}), sending every item to analysis")
+      return feeds, [], metrics
+    actionable_indexes = parse_triage_response(response_text, len(feeds))
+    if actionable_indexes is None:
+      logger.info(f"Unreadable triage response, sending every item to analysis: {response_text}")
+      return feeds, [], metrics
+
+  actionable = [feed for index, feed in enumerate(feeds) if index in actionable_indexes]
+  skipped = [feed for index, feed in enumerate(feeds) if index not in actionable_indexes]
+  return actionable, skipped, metrics
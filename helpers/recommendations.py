@@ -0,0 +1,59 @@
+import re
+import json
+from typing import Dict, List, Optional, Any
+
+from helpers.types import TradingRecommendation
+
+_CODE_BLOCK_PATTERN = re.compile(r'```(?:json)?\s*(\[.*?\])\s*```', re.DOTALL)
+_ARRAY_PATTERN = re.compile(r'\[[\s\S]*\]')
+_SIDE_PATTERN = re.compile(r'\b(BUY|SELL)\b', re.IGNORECASE)
+SIDES = ('BUY', 'SELL')
+
+def _load_json_array(text: str) -> Optional[List[Any]]:
+  try:
+    parsed = json.loads(text)
+  except (ValueError, TypeError):
+    return None
+  return parsed if isinstance(parsed, list) else None
+
+def _recommendation_side(item: Dict[str, Any], trading_idea: str) -> Optional[str]:
+  side = str(item.get('side') or '').strip().upper()
+  if side in SIDES:
+    return side
+  # Older responses have no side field; the first standalone BUY/SELL word wins
+  side_match = _SIDE_PATTERN.search(trading_idea)
+  return side_match.group(1).upper() if side_match else None
+
+def parse_recommendations(response_text: Optional[str]) -> List[TradingRecommendation]:
+  if not response_text:
+    return []
+
+  items = _load_json_array(response_text)
+  if items is None:
+    code_block_match = _CODE_BLOCK_PATTERN.search(response_text)
+    if code_block_match:
+      items = _load_json_array(code_block_match.group(1))
+  if items is None:
+    array_match = _ARRAY_PATTERN.search(response_text)
+    if array_match:
+      items = _load_json_array(array_match.group(0))
+  if not items:
+    return []
+
+  recommendations: List[TradingRecommendation] = []
+  for item in items:
+    if not isinstance(item, dict):
+      continue
+    trading_idea = str(item.get('trading_idea') or '')
+    try:
+      confidence = int(item.get('confidence_on_trading_idea') or 0)
+    except (ValueError, TypeError):
+      confidence = 0
+    recommendations.append({
+      'news_summary_referenced': str(item.get('news_summary_referenced') or ''),
+      'news_summary_segment': str(item.get('news_summary_segment') or ''),
+      'trading_idea': trading_idea,
+      'confidence_on_trading_idea': confidence,
+      'side': _recommendation_side(item, trading_idea)
+    })
+  return recommendations
@@ -0,0 +1,180 @@
+import os
+import time
+import random
+import logging
+import threading
+from enum import Enum
+from typing import Callable, Dict, TypeVar
+
+from helpers.types import ResilienceConfig
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+class CircuitOpenError(Exception):
+  pass
+
+class CircuitState(Enum):
+  CLOSED = 'CLOSED'
+  OPEN = 'OPEN'
+  HALF_OPEN = 'HALF_OPEN'
+
+class TokenBucket:
+  def __init__(self, rate_per_second: float, capacity: float):
+    self.rate_per_second = rate_per_second
+    self.capacity = capacity
+    self.tokens = capacity
+    self.updated_at = time.monotonic()
+    self.lock = threading.Lock()
+
+  def acquire(self) -> None:
+    while True:
+      with self.lock:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+        if self.tokens >= 1:
+          self.tokens -= 1
+          return
+        wait_seconds = (1 - self.tokens) / self.rate_per_second
+      time.sleep(wait_seconds)
+
+class RetryBudget:
+  def __init__(self, max_retries: int):
+    self.max_retries = max_retries
+    self.remaining = max_retries
+    self.lock = threading.Lock()
+
+  def try_spend(self) -> bool:
+    with self.lock:
+      if self.remaining <= 0:
+        return False
+      self.remaining -= 1
+      return True
+
+  def reset(self) -> None:
+    with self.lock:
+      self.remaining = self.max_retries
+
+class CircuitBreaker:
+  def __init__(self, failure_threshold: int, reset_timeout_seconds: float):
+    self.failure_threshold = failure_threshold
+    self.reset_timeout_seconds = reset_timeout_seconds
+    self.state = CircuitState.CLOSED
+    self.consecutive_failures = 0
+    self.opened_at = 0.0
+    self.lock = threading.Lock()
+
+  def allow_request(self) -> bool:
+    with self.lock:
+      if self.state == CircuitState.HALF_OPEN:
+        # The probe is still in flight; everyone else keeps failing fast
+        return False
+      if self.state == CircuitState.OPEN:
+        if time.monotonic() - self.opened_at < self.reset_timeout_seconds:
+          return False
+        # Let a single probe through; its outcome closes or reopens the circuit
+        self.state = CircuitState.HALF_OPEN
+        return True
+      return True
+
+  def is_open(self) -> bool:
+    with self.lock:
+      return self.state == CircuitState.OPEN
+
+  def record_success(self) -> None:
+    with self.lock:
+      self.state = CircuitState.CLOSED
+      self.consecutive_failures = 0
+
+  def record_failure(self) -> None:
+    with self.lock:
+      self.consecutive_failures += 1
+      if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+
+class ResilientClient:
+  def __init__(self, name: str, config: ResilienceConfig, rate_share: int = 1):
+    self.name = name
+    self.config = config
+    # Each pool worker gets an equal share of the provider limit
+    rate_per_second = config.rate_per_second / max(rate_share, 1)
+    self.token_bucket = TokenBucket(rate_per_second, max(1.0, config.burst / max(rate_share, 1)))
+    self.retry_budget = RetryBudget(config.retry_budget_per_cycle)
+    self.circuit_breaker = CircuitBreaker(config.failure_threshold, config.reset_timeout_seconds)
+
+  def call(
+    self,
+    operation: Callable[[], T],
+    is_retryable: Callable[[Exception], bool] = lambda error: True
+  ) -> T:
+    attempt = 0
+    while True:
+      if not self.circuit_breaker.allow_request():
+        raise CircuitOpenError(f"{self.name} circuit is open, failing fast")
+      self.token_bucket.acquire()
+      try:
+        result = operation()
+      except Exception as e:
+        if not is_retryable(e):
+          # The service answered, so this is not an outage; it also settles a half-open probe
+          self.circuit_breaker.record_success()
+          raise
+        self.circuit_breaker.record_failure()
+        # A failure that just opened the circuit ends the call with its own error,
+        # without spending budget on a retry the breaker would reject
+        if self.circuit_breaker.is_open():
+          raise
+        if attempt >= self.config.max_retries or not self.retry_budget.try_spend():
+          raise
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        delay = random.uniform(0, min(self.config.max_delay_seconds, self.config.base_delay_seconds * 2 ** attempt))
+        logger.info(f"{self.name} call failed ({str(e)}), retrying in {delay:.2f}s")
+        time.sleep(delay)
+        attempt += 1
+        continue
+      self.circuit_breaker.record_success()
+      return result
+
+_clients: Dict[str, ResilientClient] = {}
+_clients_lock = threading.Lock()
+_rate_share = 1
+_budget_cycle_id = ''
+
+def load_resilience_config(provider: str, default_rate_per_second: float) -> ResilienceConfig:
+  prefix = provider.upper()
+  return ResilienceConfig(
+    rate_per_second=float(os.getenv(f'{prefix}_RATE_LIMIT_PER_SECOND', str(default_rate_per_second))),
+    burst=float(os.getenv(f'{prefix}_RATE_LIMIT_BURST', str(default_rate_per_second))),
+    max_retries=int(os.getenv(f'{prefix}_MAX_RETRIES', '3')),
+    retry_budget_per_cycle=int(os.getenv(f'{prefix}_RETRY_BUDGET_PER_CYCLE', '20')),
+    base_delay_seconds=float(os.getenv(f'{prefix}_RETRY_BASE_DELAY_SECONDS', '0.5')),
+    max_delay_seconds=float(os.getenv(f'{prefix}_RETRY_MAX_DELAY_SECONDS', '8')),
+    failure_threshold=int(os.getenv(f'{prefix}_CIRCUIT_FAILURE_THRESHOLD', '5')),
+    reset_timeout_seconds=float(os.getenv(f'{prefix}_CIRCUIT_RESET_SECONDS', '60'))
+  )
+
+def set_rate_share(share: int) -> None:
+  global _rate_share
+  _rate_share = max(share, 1)
+
+def get_resilient_client(provider: str, default_rate_per_second: float) -> ResilientClient:
+  with _clients_lock:
+    client = _clients.get(provider)
+    if client is None:
+      client = ResilientClient(provider, load_resilience_config(provider, default_rate_per_second), _rate_share)
+      _clients[provider] = client
+    return client
+
+def reset_retry_budgets(cycle_id: str) -> None:
+  global _budget_cycle_id
+  # Budgets are per cycle and per process: the parent and each pool worker reset once
+  # when they first see a cycle, however many account jobs they run in it
+  with _clients_lock:
+    if cycle_id == _budget_cycle_id:
+      return
+    _budget_cycle_id = cycle_id
+    for client in _clients.values():
+      client.retry_budget.reset()
@@ -0,0 +1,46 @@
+import os
+import re
+import hashlib
+from typing import Dict, Optional, Tuple
+
+HASHED_EXTENSIONS = ('.css', '.js')
+HASH_LENGTH = 12
+
+class HashedAssetManifest:
+  def __init__(self, directory: str, index_file: str = 'index.html'):
+    self.directory = directory
+    self.index_file = index_file
+    self.hashed_names: Dict[str, str] = {}
+    self.original_names: Dict[str, str] = {}
+    self._index_html: Optional[str] = None
+    self._build()
+
+  def _build(self) -> None:
+    for file_name in sorted(os.listdir(self.directory)):
+      if not file_name.endswith(HASHED_EXTENSIONS):
+        continue
+      with open(os.path.join(self.directory, file_name), 'rb') as asset_file:
+        digest = hashlib.sha256(asset_file.read()).hexdigest()[:HASH_LENGTH]
+      stem, extension = os.path.splitext(file_name)
+      hashed_name = f'{stem}.{digest}{extension}'
+      self.hashed_names[file_name] = hashed_name
+      self.original_names[hashed_name] = file_name
+
+  def resolve(self, path: str) -> Tuple[str, bool]:
+    # Returns the file to send and whether it was requested by its content-hashed name
+    if path in self.original_names:
+      return self.original_names[path], True
+    return path, False
+
+  def render_index(self) -> str:
+    if self._index_html is None:
+      with open(os.path.join(self.directory, self.index_file), encoding='utf-8') as index_file:
+        index_html = index_file.read()
+      for file_name, hashed_name in self.hashed_names.items():
+        index_html = re.sub(
+          rf'(src|href)="{re.escape(file_name)}"',
+          rf'\1="{hashed_name}"',
+          index_html
+        )
+      self._index_html = index_html
+    return self._index_html
@@ -1,10 +1,16 @@
 from dataclasses import dataclass
-from typing import TypedDict, List
+from typing import TypedDict, List, Optional
 
 @dataclass
 class GrowwConfig:
   auth_token: str
 
+@dataclass
+class GrowwAccountConfig:
+  account_id: str
+  totp_token: str
+  totp_secret: str
+
 @dataclass
 class RSSFeedConfig:
   url: str
@@ -13,14 +19,62 @@ class RSSFeedConfig:
 class DatabaseConfig:
   url: str
   name: str
+  max_pool_size: Optional[int] = None
+
+@dataclass
+class BulkWriterConfig:
+  max_batch_size: int = 500
+  flush_interval: float = 1.0
+  write_concern_w: str = '1'
+  journal: Optional[bool] = None
+
+@dataclass
+class FeedLeaseConfig:
+  batch_size: int = 20
+  lease_seconds: int = 600
+  max_attempts: int = 5
+  retry_base_delay_seconds: int = 60
+  retry_max_delay_seconds: int = 3600
+  max_feed_age_hours: int = 24
+
+@dataclass
+class ResilienceConfig:
+  rate_per_second: float
+  burst: float
+  max_retries: int = 3
+  retry_budget_per_cycle: int = 20
+  base_delay_seconds: float = 0.5
+  max_delay_seconds: float = 8.0
+  failure_threshold: int = 5
+  reset_timeout_seconds: float = 60.0
+
+@dataclass
+class HistoryQueryConfig:
+  timezone: str = 'Asia/Kolkata'
+  default_page_size: int = 50
+  max_page_size: int = 200
+
+@dataclass
+class ModelTierConfig:
+  model: str
+  input_price_per_million: float = 0.0
+  output_price_per_million: float = 0.0
+
+@dataclass
+class ModelRoutingConfig:
+  triage_mode: str  # "model", "heuristic" or "off"
+  triage: ModelTierConfig
+  analysis: ModelTierConfig
+  base_url: Optional[str] = None
 
 class PortfolioHolding(TypedDict):
   instrument_name: str
   quantity: float
   average_price: float
-  current_price: float
-  pnl: float
-  pnl_percentage: float
+  current_price: Optional[float]
+  pnl: Optional[float]
+  pnl_percentage: Optional[float]
+  price_source: str  # "LIVE", "CACHED" or "UNAVAILABLE"
 
 
 class RSSFeedEntry(TypedDict):
@@ -30,6 +84,26 @@ class RSSFeedEntry(TypedDict):
   summary: str
 
 
+class TierMetrics(TypedDict):
+  model: str
+  calls: int
+  latency_seconds: float
+  prompt_tokens: int
+  completion_tokens: int
+  estimated_cost_usd: float
+
+
+class AccountAnalysisResult(TypedDict):
+  account_id: str
+  title_hashes: List[str]
+  political_title_hashes: List[str]
+  market_title_hashes: List[str]
+  holdings: List[PortfolioHolding]
+  response: Optional[str]
+  analysis_metrics: Optional[TierMetrics]
+  error: Optional[str]
+
+
 class ResultantLLMInputPayload(TypedDict):
   current_portfolio_holdings: List[PortfolioHolding]
   political_news: List[RSSFeedEntry]
@@ -41,4 +115,5 @@ class TradingRecommendation(TypedDict):
   news_summary_segment: str  # "MARKET_NEWS" or "POLITICAL_NEWS"
   trading_idea: str
   confidence_on_trading_idea: int  # 1-10
+  side: Optional[str]  # "BUY", "SELL" or None when the idea names neither
 
@@ -1,244 +1,668 @@
 import os
 import time
-import hashlib
+import atexit
 import traceback
 import logging
-import schedule
-import pandas as pd
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
 from dataclasses import asdict
-from pymongo.collection import Collection
-from openai import OpenAI
-from dotenv import load_dotenv
 
 from helpers.types import (
   GrowwConfig,
+  GrowwAccountConfig,
+  AccountAnalysisResult,
   RSSFeedConfig,
   ResultantLLMInputPayload,
   PortfolioHolding,
   RSSFeedEntry,
-  DatabaseConfig
+  DatabaseConfig,
+  BulkWriterConfig,
+  FeedLeaseConfig,
+  ModelRoutingConfig,
+  ModelTierConfig,
+  TierMetrics
 )
-from helpers.generate_groww_access_token import generate_groww_access_token
-from helpers.common import filter_unprocessed_feeds
-from portfolio.groww_portfolio import GrowwPortfolio
-from rss.livemint_politics_rss_feed import LivemintPoliticsRSSFeed
-from rss.livemint_market_rss_feed import LivemintMarketRSSFeed
-from prompts.news_based_prompt import generate_news_based_prompt
-from database.mongo_database import MongoDatabase
 from database.models.database_models import FeedType, LLMRequestResponseModel
+from helpers.logging_config import configure_logging
 
-load_dotenv()
+# Heavy dependencies (pandas, openai, growwapi, feedparser, pymongo) are imported
+# inside the stages that use them so the CLI and health checks start quickly
+if TYPE_CHECKING:
+  import pandas as pd
+  from pymongo.collection import Collection
+  from database.mongo_database import MongoDatabase
+  from portfolio.groww_portfolio import GrowwPortfolio
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
 
+LLM_SYSTEM_PROMPT = (
+  'You are a professional financial advisor and investment analyst. '
+  'Your recommendations must be STRICTLY based on the provided news items. '
+  'Each recommendation must have a direct, explicit connection to a specific news item. '
+  'Do not create recommendations based on general market knowledge or portfolio analysis alone. '
+  'Quality over quantity: Only provide recommendations with strong, actionable connections to the news. '
+  'Return ONLY a valid JSON array - no additional text, explanations, or markdown formatting outside the JSON.'
+)
+INSTRUMENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'master', 'groww_instruments.csv')
+DEFAULT_ACCOUNT_ID = 'default'
+
+_instruments_information: Optional['pd.DataFrame'] = None
+_account_pool: Optional[ProcessPoolExecutor] = None
+
 def calculate_pnl(current_price: float, average_price: float, quantity: float) -> Tuple[float, float]:
   pnl = (current_price - average_price) * quantity
   pnl_percentage = ((current_price - average_price) / average_price) * 100 if average_price > 0 else 0
   return pnl, pnl_percentage
 
+def get_current_price(groww_portfolio: 'GrowwPortfolio', trading_symbol: str) -> Tuple[Optional[float], str]:
+  # A failed or empty quote falls back to the last good one instead of dropping the holding or pricing it at 0
+  try:
+    current_quote = groww_portfolio.get_current_quote(trading_symbol=trading_symbol)
+    if current_quote and current_quote.get('last_price'):
+      return current_quote['last_price'], 'LIVE'
+  except Exception as e:
+    logger.info(f"Error fetching quote for {trading_symbol}: {str(e)}")
+
+  cached_quote = groww_portfolio.get_cached_quote(trading_symbol=trading_symbol)
+  if cached_quote:
+    return cached_quote['last_price'], 'CACHED'
+  return None, 'UNAVAILABLE'
+
 def get_portfolio_holdings(
-  groww_portfolio: GrowwPortfolio,
-  instruments_information: pd.DataFrame,
+  groww_portfolio: 'GrowwPortfolio',
+  instruments_information: 'pd.DataFrame',
   groww_holdings: Dict[str, Any]
 ) -> List[PortfolioHolding]:
   holdings: List[PortfolioHolding] = []
-  
+
   for holding in groww_holdings.get('holdings', []):
     try:
       trading_symbol: str = holding['trading_symbol']
-      current_quote: Optional[Dict[str, Any]] = groww_portfolio.get_current_quote(trading_symbol=trading_symbol)
-      
       instrument_match = instruments_information[
         instruments_information['trading_symbol'] == trading_symbol
       ]
-      
+
       if instrument_match.empty:
         logger.info(f"Warning: Instrument {trading_symbol} not found in instruments data. Skipping.")
         continue
-      
+
       instrument_name: str = instrument_match['name'].iloc[0]
       quantity: float = holding['quantity']
       average_price: float = holding['average_price']
-      current_price: float = current_quote.get('last_price', 0) if current_quote else 0
-      
-      pnl, pnl_percentage = calculate_pnl(current_price, average_price, quantity)
-      
+      current_price, price_source = get_current_price(groww_portfolio, trading_symbol)
+
+      pnl: Optional[float] = None
+      pnl_percentage: Optional[float] = None
+      if current_price is not None:
+        pnl, pnl_percentage = calculate_pnl(current_price, average_price, quantity)
+
       holdings.append({
         'instrument_name': instrument_name,
         'quantity': quantity,
         'average_price': average_price,
         'current_price': current_price,
         'pnl': pnl,
-        'pnl_percentage': pnl_percentage
+        'pnl_percentage': pnl_percentage,
+        'price_source': price_source
       })
     except Exception as e:
       logger.info(f"Error processing holding {holding.get('trading_symbol', 'unknown')}: {str(e)}")
       continue
-  
+
   return holdings
 
-def mark_feeds_as_processed(
-  feeds: List[RSSFeedEntry],
-  feed_table_handle: Collection
-) -> None:
-  if not feeds:
-    return
-  
-  title_hashes = [
-    hashlib.sha256(feed['title'].encode()).hexdigest()
-    for feed in feeds
-  ]
-  
-  feed_table_handle.update_many(
-    {'title_hash': {'$in': title_hashes}},
-    {'$set': {'processed': True}}
+def save_holdings_snapshot(
+  holdings: List[PortfolioHolding],
+  mongodb_database: 'MongoDatabase'
+) -> Tuple[Optional[str], Optional[Future]]:
+  from pymongo import UpdateOne
+  from helpers.llm_record_storage import HOLDINGS_SNAPSHOTS_TABLE, build_holdings_snapshot
+
+  if not holdings:
+    return None, None
+  snapshot = build_holdings_snapshot(holdings)
+  snapshot_handle = mongodb_database.get_table_handle(HOLDINGS_SNAPSHOTS_TABLE)
+  snapshot_future = mongodb_database.get_bulk_writer().enqueue(
+    snapshot_handle,
+    UpdateOne({'_id': snapshot['_id']}, {'$setOnInsert': snapshot}, upsert=True)
   )
+  return snapshot['_id'], snapshot_future
 
 def save_llm_request_response(
-  prompt: str,
   response: str,
-  llm_request_response_handle: Collection,
-  mongodb_database: MongoDatabase
-) -> None:
+  political_title_hashes: List[str],
+  market_title_hashes: List[str],
+  holdings_snapshot_id: Optional[str],
+  llm_request_response_handle: 'Collection',
+  mongodb_database: 'MongoDatabase',
+  account_id: str = DEFAULT_ACCOUNT_ID,
+  prompt_template_version: Optional[str] = None,
+  prompt_compressed: Optional[bytes] = None,
+  tier_metrics: Optional[Dict[str, TierMetrics]] = None
+) -> Future:
+  from helpers.recommendations import parse_recommendations
+  from helpers.llm_record_storage import compress_text
+  from prompts.news_based_prompt import PROMPT_TEMPLATE_VERSION
+
+  stored_response, response_encoding = compress_text(response)
   llm_model = LLMRequestResponseModel(
-    prompt=prompt,
-    prompt_response=response
+    prompt_template_version=None if prompt_compressed is not None else (prompt_template_version or PROMPT_TEMPLATE_VERSION),
+    political_title_hashes=political_title_hashes,
+    market_title_hashes=market_title_hashes,
+    holdings_snapshot_id=holdings_snapshot_id,
+    prompt_response=stored_response,
+    prompt_response_encoding=response_encoding,
+    prompt_compressed=prompt_compressed,
+    recommendations=parse_recommendations(response),
+    account_id=account_id,
+    tier_metrics=tier_metrics or {}
   )
   llm_dict = asdict(llm_model)
-  mongodb_database.save_record(llm_request_response_handle, llm_dict)
+  return mongodb_database.queue_record(llm_request_response_handle, llm_dict)
+
+def get_bulk_writer_config() -> BulkWriterConfig:
+  journal = os.getenv('MONGODB_WRITE_JOURNAL')
+  return BulkWriterConfig(
+    max_batch_size=int(os.getenv('MONGODB_WRITE_BATCH_SIZE', '500')),
+    flush_interval=float(os.getenv('MONGODB_WRITE_FLUSH_INTERVAL', '1.0')),
+    write_concern_w=os.getenv('MONGODB_WRITE_CONCERN', '1'),
+    journal=journal.lower() == 'true' if journal else None
+  )
+
+def get_feed_lease_config() -> FeedLeaseConfig:
+  return FeedLeaseConfig(
+    batch_size=int(os.getenv('FEED_LEASE_BATCH_SIZE', '20')),
+    lease_seconds=int(os.getenv('FEED_LEASE_SECONDS', '600')),
+    max_attempts=int(os.getenv('FEED_MAX_ATTEMPTS', '5')),
+    retry_base_delay_seconds=int(os.getenv('FEED_RETRY_BASE_DELAY_SECONDS', '60')),
+    retry_max_delay_seconds=int(os.getenv('FEED_RETRY_MAX_DELAY_SECONDS', '3600')),
+    max_feed_age_hours=int(os.getenv('FEED_MAX_AGE_HOURS', '24'))
+  )
+
+def get_model_routing_config() -> ModelRoutingConfig:
+  from helpers.model_routing import TRIAGE_MODES
+
+  triage_mode = os.getenv('LLM_TRIAGE_MODE', 'model').lower()
+  if triage_mode not in TRIAGE_MODES:
+    raise ValueError(f'Invalid LLM_TRIAGE_MODE: {triage_mode}')
+  # Default prices are USD per million tokens for the default models
+  return ModelRoutingConfig(
+    triage_mode=triage_mode,
+    triage=ModelTierConfig(
+      model=os.getenv('LLM_TRIAGE_MODEL', 'gpt-4.1-mini'),
+      input_price_per_million=float(os.getenv('LLM_TRIAGE_INPUT_PRICE_PER_MILLION', '0.4')),
+      output_price_per_million=float(os.getenv('LLM_TRIAGE_OUTPUT_PRICE_PER_MILLION', '1.6'))
+    ),
+    analysis=ModelTierConfig(
+      model=os.getenv('LLM_ANALYSIS_MODEL', 'gpt-4.1'),
+      input_price_per_million=float(os.getenv('LLM_ANALYSIS_INPUT_PRICE_PER_MILLION', '2.0')),
+      output_price_per_million=float(os.getenv('LLM_ANALYSIS_OUTPUT_PRICE_PER_MILLION', '8.0'))
+    ),
+    base_url=os.getenv('LLM_BASE_URL') or None
+  )
+
+def get_account_configs() -> List[GrowwAccountConfig]:
+  # GROWW_ACCOUNTS=alice,desk reads GROWW_TOTP_TOKEN_ALICE / GROWW_TOTP_SECRET_ALICE and so on
+  account_ids = [account_id.strip() for account_id in os.getenv('GROWW_ACCOUNTS', '').split(',') if account_id.strip()]
+  if not account_ids:
+    return [GrowwAccountConfig(
+      account_id=DEFAULT_ACCOUNT_ID,
+      totp_token=os.getenv('GROWW_TOTP_TOKEN'),
+      totp_secret=os.getenv('GROWW_TOTP_SECRET')
+    )]
+  return [
+    GrowwAccountConfig(
+      account_id=account_id,
+      totp_token=os.getenv(f'GROWW_TOTP_TOKEN_{account_id.upper()}'),
+      totp_secret=os.getenv(f'GROWW_TOTP_SECRET_{account_id.upper()}')
+    )
+    for account_id in account_ids
+  ]
+
+def open_database() -> 'MongoDatabase':
+  from database.mongo_database import MongoDatabase
 
-def main() -> None:
   database_config = DatabaseConfig(
     url=os.getenv('MONGODB_URI'),
     name=os.getenv('MONGODB_NAME')
   )
-  
-  mongodb_database = MongoDatabase(config=database_config)
-  feed_table_handle = mongodb_database.get_table_handle('feeds')
-  llm_request_response_handle = mongodb_database.get_table_handle('llm_request_responses')
-  
-  auth_token = generate_groww_access_token(
-    totp_token=os.getenv('GROWW_TOTP_TOKEN'),
-    totp_secret=os.getenv('GROWW_TOTP_SECRET')
-  )
-  
-  instruments_path = os.path.join(
-    os.path.dirname(__file__),
-    'master',
-    'groww_instruments.csv'
-  )
-  instruments_information = pd.read_csv(instruments_path, low_memory=False)
-  
-  groww_config = GrowwConfig(auth_token=auth_token)
-  groww_portfolio = GrowwPortfolio(config=groww_config)
-  
+  return MongoDatabase(config=database_config, writer_config=get_bulk_writer_config())
+
+def split_feeds_by_type(
+  claimed_feeds: List[Dict[str, Any]]
+) -> Tuple[List[RSSFeedEntry], List[RSSFeedEntry]]:
+  from helpers.feed_leasing import feed_document_to_entry
+
+  political_news: List[RSSFeedEntry] = []
+  market_news: List[RSSFeedEntry] = []
+  for feed in claimed_feeds:
+    if feed['type'] == FeedType.POLITICAL.value:
+      political_news.append(feed_document_to_entry(feed))
+    else:
+      market_news.append(feed_document_to_entry(feed))
+  return political_news, market_news
+
+def load_instruments() -> 'pd.DataFrame':
+  global _instruments_information
+  # Loaded once per process; pool workers reuse it for every account they handle
+  if _instruments_information is None:
+    import pandas as pd
+    _instruments_information = pd.read_csv(INSTRUMENTS_PATH, low_memory=False)
+  return _instruments_information
+
+def fetch_holdings(account: GrowwAccountConfig) -> List[PortfolioHolding]:
+  from helpers.generate_groww_access_token import generate_groww_access_token
+  from portfolio.groww_portfolio import GrowwPortfolio
+
   try:
+    auth_token = generate_groww_access_token(
+      totp_token=account.totp_token,
+      totp_secret=account.totp_secret
+    )
+    groww_config = GrowwConfig(auth_token=auth_token)
+    groww_portfolio = GrowwPortfolio(config=groww_config)
     groww_holdings = groww_portfolio.get_holdings()
-    holdings_information_for_llm = get_portfolio_holdings(
+    return get_portfolio_holdings(
       groww_portfolio,
-      instruments_information,
+      load_instruments(),
       groww_holdings
     )
   except Exception as e:
-    logger.info(f"Error fetching portfolio holdings: {str(e)}")
+    logger.info(f"Error fetching portfolio holdings for account {account.account_id}: {str(e)}")
     logger.info("Continuing with empty portfolio holdings...")
-    holdings_information_for_llm = []
-  
+    return []
+
+def ingest_feeds(feed_table_handle: 'Collection', mongodb_database: 'MongoDatabase') -> None:
+  from helpers.common import store_new_feeds
+  from helpers.feed_leasing import wait_for_feed_inserts
+  from rss.livemint_politics_rss_feed import LivemintPoliticsRSSFeed
+  from rss.livemint_market_rss_feed import LivemintMarketRSSFeed
+
   politics_config = RSSFeedConfig(url=os.getenv('LIVEMINT_POLITICS_RSS_FEED'))
   politics_feed = LivemintPoliticsRSSFeed(config=politics_config)
   political_news = politics_feed.get_today_feeds()
   parsed_political_news = politics_feed.parse_feed(political_news)
-  filtered_political_news = filter_unprocessed_feeds(
+  political_insert_futures = store_new_feeds(
     parsed_political_news,
     FeedType.POLITICAL,
     feed_table_handle,
     mongodb_database
   )
-  
+
   market_config = RSSFeedConfig(url=os.getenv('LIVEMINT_MARKET_RSS_FEED'))
   market_feed = LivemintMarketRSSFeed(config=market_config)
   market_news = market_feed.get_today_feeds()
   parsed_market_news = market_feed.parse_feed(market_news)
-  filtered_market_news = filter_unprocessed_feeds(
+  market_insert_futures = store_new_feeds(
     parsed_market_news,
     FeedType.MARKET,
     feed_table_handle,
     mongodb_database
   )
 
-  all_new_feeds = filtered_political_news + filtered_market_news
-  
-  if not all_new_feeds:
-    logger.info("No new feeds to process. Skipping LLM call.")
-    return
-  
-  resultant_payload: ResultantLLMInputPayload = {
-    'current_portfolio_holdings': holdings_information_for_llm,
-    'political_news': filtered_political_news,
-    'market_news': filtered_market_news
-  }
-  
-  llm_prompt = generate_news_based_prompt(resultant_payload)
-  llm_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-  
+  # Claims read from the collection, so they are the only step that waits on the inserts
+  wait_for_feed_inserts(political_insert_futures + market_insert_futures)
+
+def request_llm_analysis(llm_prompt: str) -> Tuple[str, TierMetrics]:
+  from helpers.model_routing import request_chat_completion
+
+  routing_config = get_model_routing_config()
+  return request_chat_completion(routing_config, routing_config.analysis, LLM_SYSTEM_PROMPT, llm_prompt)
+
+def analyze_account(
+  account: GrowwAccountConfig,
+  account_feeds: List[Dict[str, Any]],
+  cycle_id: str
+) -> AccountAnalysisResult:
+  from prompts.news_based_prompt import generate_news_based_prompt
+  from helpers.resilience import reset_retry_budgets
+  from helpers.llm_record_storage import split_title_hashes
+
+  reset_retry_budgets(cycle_id)
+
+  title_hashes = [feed['title_hash'] for feed in account_feeds]
+  political_title_hashes, market_title_hashes = split_title_hashes(account_feeds)
+  holdings_information_for_llm: List[PortfolioHolding] = []
   try:
-    llm_response = llm_client.chat.completions.create(
-      model='gpt-4.1',
-      messages=[
-        {
-          'role': 'system',
-          'content': (
-            'You are a professional financial advisor and investment analyst. '
-            'Your recommendations must be STRICTLY based on the provided news items. '
-            'Each recommendation must have a direct, explicit connection to a specific news item. '
-            'Do not create recommendations based on general market knowledge or portfolio analysis alone. '
-            'Quality over quantity: Only provide recommendations with strong, actionable connections to the news. '
-            'Return ONLY a valid JSON array - no additional text, explanations, or markdown formatting outside the JSON.'
-          )
-        },
-        {
-          'role': 'user',
-          'content': llm_prompt
-        }
-      ]
+    holdings_information_for_llm = fetch_holdings(account)
+    political_news, market_news = split_feeds_by_type(account_feeds)
+    resultant_payload: ResultantLLMInputPayload = {
+      'current_portfolio_holdings': holdings_information_for_llm,
+      'political_news': political_news,
+      'market_news': market_news
+    }
+    llm_prompt = generate_news_based_prompt(resultant_payload)
+    response_text, analysis_metrics = request_llm_analysis(llm_prompt)
+    return {
+      'account_id': account.account_id,
+      'title_hashes': title_hashes,
+      'political_title_hashes': political_title_hashes,
+      'market_title_hashes': market_title_hashes,
+      'holdings': holdings_information_for_llm,
+      'response': response_text,
+      'analysis_metrics': analysis_metrics,
+      'error': None
+    }
+  except Exception as e:
+    logger.info(f"Error analysing account {account.account_id}: {str(e)}")
+    traceback.print_exc()
+    return failed_account_result(account, account_feeds, str(e))
+
+def failed_account_result(
+  account: GrowwAccountConfig,
+  account_feeds: List[Dict[str, Any]],
+  error: str
+) -> AccountAnalysisResult:
+  from helpers.llm_record_storage import split_title_hashes
+
+  political_title_hashes, market_title_hashes = split_title_hashes(account_feeds)
+  return {
+    'account_id': account.account_id,
+    'title_hashes': [feed['title_hash'] for feed in account_feeds],
+    'political_title_hashes': political_title_hashes,
+    'market_title_hashes': market_title_hashes,
+    'holdings': [],
+    'response': None,
+    'analysis_metrics': None,
+    'error': error
+  }
+
+def _shutdown_account_pool() -> None:
+  global _account_pool
+  if _account_pool is not None:
+    _account_pool.shutdown(wait=True)
+    _account_pool = None
+
+def init_account_worker(worker_count: int) -> None:
+  from helpers.resilience import set_rate_share
+
+  configure_logging()
+  set_rate_share(worker_count)
+
+def get_account_pool(max_workers: int) -> ProcessPoolExecutor:
+  global _account_pool
+  if _account_pool is None:
+    # Spawned rather than forked: the parent holds a MongoClient and the bulk writer thread
+    _account_pool = ProcessPoolExecutor(
+      max_workers=max_workers,
+      mp_context=multiprocessing.get_context('spawn'),
+      initializer=init_account_worker,
+      initargs=(max_workers,)
     )
-    
-    response_text = llm_response.choices[0].message.content or ""
-    logger.info(response_text)
-    
-    mark_feeds_as_processed(all_new_feeds, feed_table_handle)
-    save_llm_request_response(
-      llm_prompt,
-      response_text,
+    atexit.register(_shutdown_account_pool)
+  return _account_pool
+
+def run_account_jobs(
+  account_jobs: List[Tuple[GrowwAccountConfig, List[Dict[str, Any]]]],
+  cycle_id: str
+) -> List[AccountAnalysisResult]:
+  if len(account_jobs) <= 1:
+    return [analyze_account(account, account_feeds, cycle_id) for account, account_feeds in account_jobs]
+
+  max_workers = int(os.getenv('ACCOUNT_WORKERS', str(min(len(account_jobs), os.cpu_count() or 1))))
+  pool = get_account_pool(max_workers)
+  futures = [pool.submit(analyze_account, account, account_feeds, cycle_id) for account, account_feeds in account_jobs]
+
+  # A crashed worker or an unpicklable result fails only its own account, so the
+  # other accounts' results are still saved and the feeds go through fail_feeds
+  results: List[AccountAnalysisResult] = []
+  pool_broken = False
+  for future, (account, account_feeds) in zip(futures, account_jobs):
+    try:
+      results.append(future.result())
+    except Exception as e:
+      logger.info(f"Account worker for {account.account_id} failed: {str(e)}")
+      pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+      results.append(failed_account_result(account, account_feeds, f'{type(e).__name__}: {str(e)}'))
+  if pool_broken:
+    # A broken pool rejects all further work; the next cycle starts a fresh one
+    _shutdown_account_pool()
+  return results
+
+def slim_feed_document(feed: Dict[str, Any]) -> Dict[str, Any]:
+  # Only the fields the prompt needs are sent to the account workers
+  return {
+    'title_hash': feed['title_hash'],
+    'type': feed['type'],
+    'title': feed['title'],
+    'link': feed['link'],
+    'summary': feed['summary'],
+    'published_at': feed['published_at']
+  }
+
+def save_account_results(
+  results: List[AccountAnalysisResult],
+  triage_metrics: TierMetrics,
+  feed_table_handle: 'Collection',
+  llm_request_response_handle: 'Collection',
+  mongodb_database: 'MongoDatabase'
+) -> List[AccountAnalysisResult]:
+  from helpers.feed_leasing import record_account_progress
+
+  # Records point at their holdings snapshot, so the snapshots are stored first
+  snapshot_writes = [save_holdings_snapshot(result['holdings'], mongodb_database) for result in results]
+  mongodb_database.flush_writes()
+
+  failed_results: List[AccountAnalysisResult] = []
+  record_writes: List[Tuple[AccountAnalysisResult, Future]] = []
+  for result, (holdings_snapshot_id, snapshot_future) in zip(results, snapshot_writes):
+    try:
+      if snapshot_future is not None:
+        snapshot_future.result()
+    except Exception as e:
+      logger.info(f"Error saving holdings snapshot for account {result['account_id']}: {str(e)}")
+      failed_results.append({**result, 'error': f'Holdings snapshot write failed: {str(e)}'})
+      continue
+    record_future = save_llm_request_response(
+      result['response'],
+      result['political_title_hashes'],
+      result['market_title_hashes'],
+      holdings_snapshot_id,
       llm_request_response_handle,
-      mongodb_database
+      mongodb_database,
+      account_id=result['account_id'],
+      # Triage runs once per cycle, so its metrics are shared by every record of the cycle
+      tier_metrics={'triage': triage_metrics, 'analysis': result['analysis_metrics']}
     )
-    
-  except Exception as e:
-    logger.info(f"Error calling OpenAI API: {str(e)}")
-    logger.info("Make sure you have set OPENAI_API_KEY in your .env file and have access to the model.")
-    traceback.print_exc()
+    record_writes.append((result, record_future))
+  mongodb_database.flush_writes()
+
+  # An account only counts as done once its recommendation is stored; a lost write retries the feeds
+  for result, record_future in record_writes:
+    try:
+      record_future.result()
+    except Exception as e:
+      logger.info(f"Error saving LLM response for account {result['account_id']}: {str(e)}")
+      failed_results.append({**result, 'error': f'LLM response write failed: {str(e)}'})
+      continue
+    record_account_progress(result['title_hashes'], result['account_id'], feed_table_handle, mongodb_database)
+  return failed_results
+
+def is_retried_feed(feed: Dict[str, Any]) -> bool:
+  return feed.get('attempts', 0) > 1 or bool(feed.get('processed_accounts'))
+
+def add_tier_metrics(total: TierMetrics, metrics: TierMetrics) -> None:
+  for key in ('calls', 'latency_seconds', 'prompt_tokens', 'completion_tokens', 'estimated_cost_usd'):
+    total[key] += metrics[key]
+
+def log_tier_metrics(tier_name: str, metrics: TierMetrics) -> None:
+  logger.info(
+    f"[{tier_name}] model={metrics['model']} calls={metrics['calls']} "
+    f"latency={metrics['latency_seconds']:.2f}s tokens={metrics['prompt_tokens']}+{metrics['completion_tokens']} "
+    f"cost=${metrics['estimated_cost_usd']:.4f}"
+  )
+
+def main() -> None:
+  mongodb_database = open_database()
+  try:
+    run_cycle(mongodb_database)
+  finally:
+    # Pending writes are flushed before the cycle ends so the next cycle's dedup sees them
+    mongodb_database.close()
+
+def run_cycle(mongodb_database: 'MongoDatabase') -> None:
+  from helpers.feed_leasing import (
+    create_worker_id,
+    claim_feeds,
+    complete_feeds,
+    fail_feeds,
+    feeds_pending_for_account
+  )
+  from helpers.model_routing import triage_feeds, empty_tier_metrics
+  from helpers.resilience import reset_retry_budgets
+
+  feed_table_handle = mongodb_database.get_table_handle('feeds')
+  llm_request_response_handle = mongodb_database.get_table_handle('llm_request_responses')
+
+  # News is ingested and claimed once, then shared by every account
+  ingest_feeds(feed_table_handle, mongodb_database)
+
+  lease_config = get_feed_lease_config()
+  # The worker id is unique per cycle, so it doubles as the retry-budget cycle id
+  worker_id = create_worker_id()
+  reset_retry_budgets(worker_id)
+  claimed_feeds = claim_feeds(feed_table_handle, worker_id, lease_config)
+
+  if not claimed_feeds:
+    logger.info("No new feeds to process. Skipping LLM call.")
+    return
+
+  # The cheap tier screens the batch once so only actionable news reaches the analysis model.
+  # Retried items already passed triage and still owe some accounts an analysis, so they skip it
+  routing_config = get_model_routing_config()
+  retried_feeds = [feed for feed in claimed_feeds if is_retried_feed(feed)]
+  new_feeds = [feed for feed in claimed_feeds if not is_retried_feed(feed)]
+  actionable_feeds, skipped_feeds, triage_metrics = triage_feeds(new_feeds, routing_config)
+  complete_feeds(skipped_feeds, feed_table_handle, mongodb_database, worker_id, skipped_by_triage=True)
+  logger.info(
+    f"Triage ({routing_config.triage_mode}): {len(actionable_feeds)} of {len(new_feeds)} new news items are actionable, "
+    f"{len(retried_feeds)} retried items bypass triage"
+  )
+  claimed_feeds = retried_feeds + actionable_feeds
+  log_tier_metrics('triage', triage_metrics)
+
+  if not claimed_feeds:
+    logger.info("No actionable feeds to process. Skipping analysis call.")
+    return
+
+  account_jobs: List[Tuple[GrowwAccountConfig, List[Dict[str, Any]]]] = []
+  for account in get_account_configs():
+    pending_feeds = feeds_pending_for_account(claimed_feeds, account.account_id)
+    if pending_feeds:
+      account_jobs.append((account, [slim_feed_document(feed) for feed in pending_feeds]))
+
+  failed_results: List[AccountAnalysisResult] = []
+  analysed_results: List[AccountAnalysisResult] = []
+  analysis_metrics = empty_tier_metrics(routing_config.analysis)
+  for result in run_account_jobs(account_jobs, worker_id):
+    if result['error'] is not None:
+      failed_results.append(result)
+      continue
+    add_tier_metrics(analysis_metrics, result['analysis_metrics'])
+    logger.info(f"[{result['account_id']}] {result['response']}")
+    analysed_results.append(result)
+  log_tier_metrics('analysis', analysis_metrics)
+  failed_results.extend(save_account_results(
+    analysed_results,
+    triage_metrics,
+    feed_table_handle,
+    llm_request_response_handle,
+    mongodb_database
+  ))
+
+  if not failed_results:
+    complete_feeds(claimed_feeds, feed_table_handle, mongodb_database, worker_id)
+    return
+
+  # Feeds are retried only for the accounts that failed; the rest are recorded as done
+  error_summary = '; '.join(f"{result['account_id']}: {result['error']}" for result in failed_results)
+  logger.info(f"Accounts failed this cycle: {error_summary}")
+  logger.info("Make sure you have set OPENAI_API_KEY in your .env file and have access to the model.")
+  fail_feeds(claimed_feeds, feed_table_handle, mongodb_database, worker_id, error_summary, lease_config)
+
+def migrate() -> None:
+  from helpers.feed_leasing import prepare_feed_collection
+
+  mongodb_database = open_database()
+  try:
+    prepare_feed_collection(mongodb_database.get_table_handle('feeds'))
+  finally:
+    mongodb_database.close()
+
+def ingest_only() -> None:
+  from helpers.feed_leasing import prepare_feed_collection
+
+  mongodb_database = open_database()
+  try:
+    feed_table_handle = mongodb_database.get_table_handle('feeds')
+    prepare_feed_collection(feed_table_handle)
+    ingest_feeds(feed_table_handle, mongodb_database)
+  finally:
+    mongodb_database.close()
+
+def replay(record_id: Optional[str] = None, save: bool = False) -> Optional[str]:
+  from bson import ObjectId
+  from pymongo import DESCENDING
+  from helpers.llm_record_storage import HOLDINGS_SNAPSHOTS_TABLE, compress_prompt, reconstruct_prompt
+
+  mongodb_database = open_database()
+  try:
+    llm_request_response_handle = mongodb_database.get_table_handle('llm_request_responses')
+    if record_id:
+      record = llm_request_response_handle.find_one({'_id': ObjectId(record_id)})
+    else:
+      record = llm_request_response_handle.find_one({}, sort=[('created_at', DESCENDING)])
+    if record is None:
+      logger.info("No LLM request found to replay.")
+      return None
+
+    logger.info(f"Replaying LLM request {record['_id']}")
+    llm_prompt = reconstruct_prompt(
+      record,
+      mongodb_database.get_table_handle('feeds'),
+      mongodb_database.get_table_handle(HOLDINGS_SNAPSHOTS_TABLE)
+    )
+    response_text, analysis_metrics = request_llm_analysis(llm_prompt)
+    log_tier_metrics('analysis', analysis_metrics)
+    if save:
+      # Records that were never converted to references keep their prompt text
+      is_referenced = record.get('prompt_template_version') is not None
+      record_future = save_llm_request_response(
+        response_text,
+        record.get('political_title_hashes', []),
+        record.get('market_title_hashes', []),
+        record.get('holdings_snapshot_id'),
+        llm_request_response_handle,
+        mongodb_database,
+        account_id=record.get('account_id', DEFAULT_ACCOUNT_ID),
+        prompt_template_version=record.get('prompt_template_version'),
+        prompt_compressed=None if is_referenced else compress_prompt(llm_prompt),
+        tier_metrics={'analysis': analysis_metrics}
+      )
+      mongodb_database.flush_writes()
+      record_future.result()
+    return response_text
+  finally:
+    mongodb_database.close()
+
+def run_daemon(interval_minutes: int = 30) -> None:
+  import schedule
+
+  schedule.every(interval_minutes).minutes.do(main)
 
-if __name__ == '__main__':
-  schedule.every(30).minutes.do(main)
-  
   logger.info("=" * 80)
   logger.info("News Investing Advisor - Scheduled Execution")
   logger.info("=" * 80)
   logger.info(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-  logger.info("Running every 30 minutes...")
+  logger.info(f"Running every {interval_minutes} minutes...")
   logger.info("Press Ctrl+C to stop")
   logger.info("=" * 80 + "\n")
-  
+
   main()
-  
+
   try:
     while True:
       schedule.run_pending()
@@ -247,4 +671,6 @@ if __name__ == '__main__':
     logger.info(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Stopping scheduler...")
     logger.info("Goodbye!")
 
-
+if __name__ == '__main__':
+  from cli import main as cli_main
+  cli_main(['daemon'])
@@ -15,4 +15,12 @@ class AbstractPortfolio(ABC):
   ) -> Optional[Dict[str, Any]]:
     pass
 
+  def get_cached_quote(
+    self,
+    trading_symbol: str,
+    exchange: Optional[str] = None,
+    segment: Optional[str] = None
+  ) -> Optional[Dict[str, Any]]:
+    return None
+
 
@@ -1,9 +1,35 @@
-from typing import Optional, Dict, Any
+import os
+import time
+from typing import Optional, Dict, Any, Tuple
 from growwapi import GrowwAPI
+from growwapi.groww.exceptions import (
+  GrowwAPIAuthenticationException,
+  GrowwAPIAuthorisationException,
+  GrowwAPIBadRequestException,
+  GrowwAPINotFoundException,
+  InstrumentNotFoundException
+)
 
 from helpers.types import GrowwConfig
+from helpers.resilience import get_resilient_client
 from portfolio.abstract_portfolio import AbstractPortfolio
 
+# Groww documents 10 requests/second for live data
+GROWW_RATE_LIMIT_PER_SECOND = 10
+NON_RETRYABLE_ERRORS = (
+  GrowwAPIAuthenticationException,
+  GrowwAPIAuthorisationException,
+  GrowwAPIBadRequestException,
+  GrowwAPINotFoundException,
+  InstrumentNotFoundException
+)
+
+# Shared by every GrowwPortfolio in the process so quotes survive across cycles
+_quote_cache: Dict[Tuple[str, str, str], Tuple[Dict[str, Any], float]] = {}
+
+def _is_retryable(error: Exception) -> bool:
+  return not isinstance(error, NON_RETRYABLE_ERRORS)
+
 class GrowwPortfolio(AbstractPortfolio):
   TIMEOUT = 5
 
@@ -12,9 +38,14 @@ class GrowwPortfolio(AbstractPortfolio):
       raise ValueError('GrowwConfig is required')
     self.config = config
     self.groww = GrowwAPI(self.config.auth_token)
+    self.client = get_resilient_client('groww', GROWW_RATE_LIMIT_PER_SECOND)
+    self.quote_cache_ttl = float(os.getenv('QUOTE_CACHE_TTL_SECONDS', str(6 * 60 * 60)))
 
   def get_holdings(self) -> Dict[str, Any]:
-    return self.groww.get_holdings_for_user(timeout=self.TIMEOUT)
+    return self.client.call(
+      lambda: self.groww.get_holdings_for_user(timeout=self.TIMEOUT),
+      is_retryable=_is_retryable
+    )
 
   def get_current_quote(
     self,
@@ -24,10 +55,31 @@ class GrowwPortfolio(AbstractPortfolio):
   ) -> Optional[Dict[str, Any]]:
     exchange = exchange or self.groww.EXCHANGE_NSE
     segment = segment or self.groww.SEGMENT_CASH
-    return self.groww.get_quote(
-      trading_symbol=trading_symbol,
-      exchange=exchange,
-      segment=segment
+    quote = self.client.call(
+      lambda: self.groww.get_quote(
+        trading_symbol=trading_symbol,
+        exchange=exchange,
+        segment=segment,
+        timeout=self.TIMEOUT
+      ),
+      is_retryable=_is_retryable
     )
+    if quote and quote.get('last_price'):
+      _quote_cache[(trading_symbol, exchange, segment)] = (quote, time.monotonic())
+    return quote
 
-
+  def get_cached_quote(
+    self,
+    trading_symbol: str,
+    exchange: Optional[str] = None,
+    segment: Optional[str] = None
+  ) -> Optional[Dict[str, Any]]:
+    exchange = exchange or self.groww.EXCHANGE_NSE
+    segment = segment or self.groww.SEGMENT_CASH
+    cached = _quote_cache.get((trading_symbol, exchange, segment))
+    if cached is None:
+      return None
+    quote, cached_at = cached
+    if time.monotonic() - cached_at > self.quote_cache_ttl:
+      return None
+    return quote
@@ -1,6 +1,10 @@
 from helpers.types import ResultantLLMInputPayload
 
-def generate_news_based_prompt(llm_input_payload: ResultantLLMInputPayload) -> str:
+# Bump whenever the rendered text changes; stored records are rebuilt with the template they were saved under
+PROMPT_TEMPLATE_VERSION = 'news-v2'
+
+def generate_news_based_prompt(llm_input_payload: ResultantLLMInputPayload, include_side: bool = True) -> str:
+  # include_side=False renders news-v1, which had no explicit side field
 
   llm_prompt: str = ''
   portfolio_information: list[str] = []
@@ -8,10 +12,16 @@ def generate_news_based_prompt(llm_input_payload: ResultantLLMInputPayload) -> s
   market_news_list: list[str] = []
 
   for holding in llm_input_payload['current_portfolio_holdings']:
-    portfolio_sentence: str = (
-      f"I have invested in {holding['instrument_name']} which has average price {holding['average_price']}, "
-      f"my pnl percentage for this asset is {holding['pnl_percentage']:.2f}%, and quantity is {holding['quantity']}"
-    )
+    if holding.get('pnl_percentage') is None:
+      portfolio_sentence: str = (
+        f"I have invested in {holding['instrument_name']} which has average price {holding['average_price']}, "
+        f"the current price for this asset is unavailable, and quantity is {holding['quantity']}"
+      )
+    else:
+      portfolio_sentence = (
+        f"I have invested in {holding['instrument_name']} which has average price {holding['average_price']}, "
+        f"my pnl percentage for this asset is {holding['pnl_percentage']:.2f}%, and quantity is {holding['quantity']}"
+      )
     portfolio_information.append(portfolio_sentence)
 
   for political_news in llm_input_payload['political_news']:
@@ -71,6 +81,8 @@ def generate_news_based_prompt(llm_input_payload: ResultantLLMInputPayload) -> s
   llm_prompt += "{\n"
   llm_prompt += "  \"news_summary_referenced\": \"<exact news summary text that supports this recommendation>\",\n"
   llm_prompt += "  \"news_summary_segment\": \"MARKET_NEWS\" or \"POLITICAL_NEWS\",\n"
+  if include_side:
+    llm_prompt += "  \"side\": \"BUY\" or \"SELL\",\n"
   llm_prompt += "  \"trading_idea\": \"<detailed trading idea including asset name, entry price, exit price, and rationale>\",\n"
   llm_prompt += "  \"confidence_on_trading_idea\": <number between 1 and 10>\n"
   llm_prompt += "}\n\n"
@@ -112,6 +124,8 @@ def generate_news_based_prompt(llm_input_payload: ResultantLLMInputPayload) -> s
   llm_prompt += "  {\n"
   llm_prompt += '    "news_summary_referenced": "<EXACT complete text from news items above>",\n'
   llm_prompt += '    "news_summary_segment": "MARKET_NEWS" or "POLITICAL_NEWS",\n'
+  if include_side:
+    llm_prompt += '    "side": "BUY" or "SELL",\n'
   llm_prompt += '    "trading_idea": "<BUY/SELL: Asset name at entry price ₹X, exit at ₹Y. Clear explanation of how the news supports this action>",\n'
   llm_prompt += '    "confidence_on_trading_idea": <number 1-10>\n'
   llm_prompt += "  }\n"
@@ -1,22 +1,25 @@
-import feedparser
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
 from helpers.types import RSSFeedConfig
 
+if TYPE_CHECKING:
+  import feedparser
+
 class AbstractRSSFeed(ABC):
   def __init__(self, config: Optional[RSSFeedConfig] = None):
     if config is None:
       raise ValueError('RSS feed config is required.')
     self.config = config
+    import feedparser
     self.feed = feedparser.parse(self.config.url)
 
   @abstractmethod
-  def get_today_feeds(self) -> List[feedparser.FeedParserDict]:
+  def get_today_feeds(self) -> List['feedparser.FeedParserDict']:
     pass
 
   @abstractmethod
-  def parse_feed(self, feed_entries: Optional[List[feedparser.FeedParserDict]] = None) -> List[dict]:
+  def parse_feed(self, feed_entries: Optional[List['feedparser.FeedParserDict']] = None) -> List[dict]:
     pass
 
 
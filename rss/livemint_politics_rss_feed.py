@@ -1,26 +1,20 @@
 import os
 import json
 import logging
-import feedparser
 from datetime import datetime
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import List, Optional, TYPE_CHECKING
 from email.utils import parsedate_to_datetime
 
 from helpers.types import RSSFeedConfig
 from rss.abstract_rss_feed import AbstractRSSFeed
 
-load_dotenv()
+if TYPE_CHECKING:
+  import feedparser
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
 
 class LivemintPoliticsRSSFeed(AbstractRSSFeed):
-  def get_today_feeds(self) -> List[feedparser.FeedParserDict]:
+  def get_today_feeds(self) -> List['feedparser.FeedParserDict']:
     today = datetime.now().date()
     today_entries = []
     
@@ -32,7 +26,7 @@ class LivemintPoliticsRSSFeed(AbstractRSSFeed):
     
     return today_entries
 
-  def parse_feed(self, feed_entries: Optional[List[feedparser.FeedParserDict]] = None) -> List[dict]:
+  def parse_feed(self, feed_entries: Optional[List['feedparser.FeedParserDict']] = None) -> List[dict]:
     if feed_entries is None:
       return []
     
@@ -47,6 +41,11 @@ class LivemintPoliticsRSSFeed(AbstractRSSFeed):
     ]
 
 if __name__ == '__main__':
+  from dotenv import load_dotenv
+  from helpers.logging_config import configure_logging
+
+  load_dotenv()
+  configure_logging()
   config = RSSFeedConfig(url=os.getenv('LIVEMINT_POLITICS_RSS_FEED'))
   rss_feed = LivemintPoliticsRSSFeed(config=config)
   feed_entries = rss_feed.get_today_feeds()
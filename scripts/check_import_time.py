@@ -0,0 +1,112 @@
+import os
+import re
+import sys
+import argparse
+import subprocess
+from typing import Dict, List, Set, Tuple
+
+# Cold-start guard for the CLI. It fails when importing the entry points loads a
+# third-party module, or when their import time grows past a multiple of a fixed
+# stdlib reference import timed on the same machine in the same run. The ratio,
+# unlike a wall-clock budget, holds across machines of different speeds.
+
+ENTRY_MODULES = ['cli', 'main']
+# Pure-Python stdlib modules the entry points do not import, used as the timing yardstick
+REFERENCE_MODULES = ['email.message', 'http.client', 'decimal', 'xml.dom.minidom', 'csv', 'tarfile']
+DEFAULT_MAX_RATIO = 2.5
+IMPORT_TIME_PATTERN = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+LOADED_MODULES_SCRIPT = "import sys; {imports}print('\\n'.join(sys.modules))"
+
+def measure_imports(repo_root: str, module_names: List[str]) -> Dict[str, float]:
+  result = subprocess.run(
+    [sys.executable, '-X', 'importtime', '-c', f"import {', '.join(module_names)}"],
+    cwd=repo_root,
+    capture_output=True,
+    text=True,
+    check=True
+  )
+  cumulative_ms: Dict[str, float] = {}
+  for line in result.stderr.splitlines():
+    match = IMPORT_TIME_PATTERN.match(line)
+    if not match:
+      continue
+    _, cumulative_us, indent, module_name = match.groups()
+    if not indent and module_name in module_names:
+      cumulative_ms[module_name] = int(cumulative_us) / 1000
+  return cumulative_ms
+
+def loaded_top_level_modules(repo_root: str, module_names: List[str]) -> Set[str]:
+  imports = f"import {', '.join(module_names)}; " if module_names else ''
+  result = subprocess.run(
+    [sys.executable, '-c', LOADED_MODULES_SCRIPT.format(imports=imports)],
+    cwd=repo_root,
+    capture_output=True,
+    text=True,
+    check=True
+  )
+  return {module_name.split('.')[0] for module_name in result.stdout.split()}
+
+def is_repo_module(repo_root: str, module_name: str) -> bool:
+  return os.path.isdir(os.path.join(repo_root, module_name)) or os.path.isfile(os.path.join(repo_root, f'{module_name}.py'))
+
+def find_third_party_imports(repo_root: str) -> List[str]:
+  # Modules the bare interpreter already loads (site hooks, .pth files) are not the entry points' doing,
+  # and dunder names such as __mp_main__ are aliases rather than imports
+  startup_modules = loaded_top_level_modules(repo_root, [])
+  return sorted(
+    module_name
+    for module_name in loaded_top_level_modules(repo_root, ENTRY_MODULES) - startup_modules
+    if not module_name.startswith('__')
+    and module_name not in sys.stdlib_module_names
+    and not is_repo_module(repo_root, module_name)
+  )
+
+def measure_best_of(repo_root: str, runs: int) -> Tuple[float, Dict[str, float], float]:
+  # Entry and reference imports alternate so both see the same machine load
+  best_entry_ms = float('inf')
+  best_breakdown: Dict[str, float] = {}
+  best_reference_ms = float('inf')
+  for _ in range(runs):
+    cumulative_ms = measure_imports(repo_root, ENTRY_MODULES)
+    if sum(cumulative_ms.values()) < best_entry_ms:
+      best_entry_ms = sum(cumulative_ms.values())
+      best_breakdown = cumulative_ms
+    best_reference_ms = min(best_reference_ms, sum(measure_imports(repo_root, REFERENCE_MODULES).values()))
+  return best_entry_ms, best_breakdown, best_reference_ms
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description='Check the cold-start import budget of the CLI entry points.')
+  ratio_env = os.getenv('IMPORT_TIME_MAX_RATIO')
+  parser.add_argument(
+    '--max-ratio',
+    type=float,
+    default=float(ratio_env) if ratio_env else DEFAULT_MAX_RATIO,
+    help='Fail when entry point import time exceeds this multiple of the stdlib reference import'
+  )
+  parser.add_argument('--runs', type=int, default=5, help='Best of N runs, to smooth out noise')
+  args = parser.parse_args()
+
+  repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+  entry_ms, breakdown, reference_ms = measure_best_of(repo_root, args.runs)
+  ratio = entry_ms / reference_ms if reference_ms else float('inf')
+  third_party_imports = find_third_party_imports(repo_root)
+
+  breakdown_text = ', '.join(f'{name}={duration:.1f}ms' for name, duration in breakdown.items())
+  print(
+    f"Entry point import time: {entry_ms:.1f} ms ({breakdown_text}), "
+    f"{ratio:.2f}x the stdlib reference ({reference_ms:.1f} ms), budget {args.max_ratio:.2f}x"
+  )
+
+  failed = False
+  if third_party_imports:
+    print(f"FAIL: third-party modules imported at startup: {', '.join(third_party_imports)}")
+    failed = True
+  if ratio > args.max_ratio:
+    print(f"FAIL: import time exceeds budget ({ratio:.2f}x > {args.max_ratio:.2f}x)")
+    failed = True
+  if not failed:
+    print("OK")
+  return 1 if failed else 0
+
+if __name__ == '__main__':
+  sys.exit(main())
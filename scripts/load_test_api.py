@@ -0,0 +1,99 @@
+import sys
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from typing import List, Dict
+
+DEFAULT_PATHS = [
+  '/api/llm-responses/today',
+  '/api/llm-responses?limit=50',
+  '/'
+]
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+  if not sorted_values:
+    return 0.0
+  index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+  return sorted_values[index]
+
+def run_worker(
+  base_url: str,
+  paths: List[str],
+  deadline: float,
+  latencies: List[float],
+  status_counts: Dict[str, int],
+  lock: threading.Lock
+) -> None:
+  local_latencies: List[float] = []
+  local_statuses: Dict[str, int] = {}
+  request_number = 0
+
+  while time.perf_counter() < deadline:
+    path = paths[request_number % len(paths)]
+    request_number += 1
+    request = urllib.request.Request(base_url + path, headers={'Accept-Encoding': 'gzip'})
+    started = time.perf_counter()
+    try:
+      with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+        status = str(response.status)
+    except urllib.error.HTTPError as e:
+      status = str(e.code)
+    except Exception as e:
+      status = type(e).__name__
+    local_latencies.append(time.perf_counter() - started)
+    local_statuses[status] = local_statuses.get(status, 0) + 1
+
+  with lock:
+    latencies.extend(local_latencies)
+    for status, count in local_statuses.items():
+      status_counts[status] = status_counts.get(status, 0) + count
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description='Measure API throughput and latency percentiles.')
+  parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of a running API server')
+  parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+  parser.add_argument('--concurrency', type=int, default=16)
+  parser.add_argument('--duration', type=float, default=30.0, help='Seconds to run')
+  parser.add_argument('--max-p99-ms', type=float, help='Exit non-zero when p99 latency exceeds this')
+  args = parser.parse_args()
+
+  paths = args.paths or DEFAULT_PATHS
+  latencies: List[float] = []
+  status_counts: Dict[str, int] = {}
+  lock = threading.Lock()
+
+  started = time.perf_counter()
+  deadline = started + args.duration
+  workers = [
+    threading.Thread(
+      target=run_worker,
+      args=(args.url.rstrip('/'), paths, deadline, latencies, status_counts, lock)
+    )
+    for _ in range(args.concurrency)
+  ]
+  for worker in workers:
+    worker.start()
+  for worker in workers:
+    worker.join()
+  elapsed = time.perf_counter() - started
+
+  latencies.sort()
+  p99_ms = percentile(latencies, 0.99) * 1000
+  print(f"Requests:     {len(latencies)} in {elapsed:.1f}s with concurrency {args.concurrency}")
+  print(f"Requests/sec: {len(latencies) / elapsed:.1f}")
+  print(f"Latency p50:  {percentile(latencies, 0.50) * 1000:.1f} ms")
+  print(f"Latency p95:  {percentile(latencies, 0.95) * 1000:.1f} ms")
+  print(f"Latency p99:  {p99_ms:.1f} ms")
+  print(f"Latency max:  {(latencies[-1] if latencies else 0) * 1000:.1f} ms")
+  print(f"Statuses:     {dict(sorted(status_counts.items()))}")
+
+  if args.max_p99_ms is not None and p99_ms > args.max_p99_ms:
+    print(f"p99 latency {p99_ms:.1f} ms exceeds budget of {args.max_p99_ms:.1f} ms")
+    return 1
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
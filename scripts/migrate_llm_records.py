@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import argparse
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models.database_models import FeedType
+from database.mongo_database import MongoDatabase
+from helpers.types import DatabaseConfig, PortfolioHolding, ResultantLLMInputPayload
+from helpers.feed_leasing import feed_document_to_entry
+from helpers.logging_config import configure_logging
+from helpers.recommendations import parse_recommendations
+from helpers.llm_record_storage import (
+  HOLDINGS_SNAPSHOTS_TABLE,
+  LEGACY_PROMPT_TEMPLATE_VERSION,
+  PROMPT_TEMPLATES,
+  build_holdings_snapshot,
+  compress_prompt,
+  compress_text
+)
+
+# Converts records saved with the full prompt text into template/feed/holdings references.
+# A record is only converted when the rebuilt prompt matches the stored one exactly;
+# anything else keeps its prompt as compressed text.
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+HOLDING_PATTERN = re.compile(
+  r'^I have invested in (?P<name>.+) which has average price (?P<average_price>\S+), '
+  r'(?:my pnl percentage for this asset is (?P<pnl_percentage>\S+)%|the current price for this asset is unavailable), '
+  r'and quantity is (?P<quantity>\S+)$'
+)
+NUMBERED_LINE_PATTERN = re.compile(r'^\d+\. (.*)$')
+SECTION_FEED_TYPES = {
+  'POLITICAL NEWS:': FeedType.POLITICAL,
+  'MARKET NEWS:': FeedType.MARKET
+}
+
+def parse_number(value: str) -> Union[int, float]:
+  # Holdings are rendered with str(), so integers must come back as integers to round-trip
+  return int(value) if re.fullmatch(r'-?\d+', value) else float(value)
+
+def parse_prompt_sections(prompt: str) -> Dict[str, List[str]]:
+  sections: Dict[str, List[str]] = {}
+  current_section: Optional[str] = None
+  for line in prompt.split('\n'):
+    if line in ('PORTFOLIO HOLDINGS:', 'POLITICAL NEWS:', 'MARKET NEWS:'):
+      current_section = line
+      sections[current_section] = []
+      continue
+    if current_section is None:
+      continue
+    match = NUMBERED_LINE_PATTERN.match(line)
+    if match:
+      sections[current_section].append(match.group(1))
+    elif line:
+      current_section = None
+  return sections
+
+def parse_holdings(lines: List[str]) -> Optional[List[PortfolioHolding]]:
+  holdings: List[PortfolioHolding] = []
+  for line in lines:
+    match = HOLDING_PATTERN.match(line)
+    if not match:
+      return None
+    pnl_percentage = match.group('pnl_percentage')
+    # Only the fields the prompt renders survive in legacy records
+    holdings.append({
+      'instrument_name': match.group('name'),
+      'quantity': parse_number(match.group('quantity')),
+      'average_price': parse_number(match.group('average_price')),
+      'current_price': None,
+      'pnl': None,
+      'pnl_percentage': float(pnl_percentage) if pnl_percentage is not None else None,
+      'price_source': 'UNAVAILABLE'
+    })
+  return holdings
+
+def find_feeds(summaries: List[str], feed_type: FeedType, feed_table_handle) -> Optional[List[Dict[str, Any]]]:
+  feeds: List[Dict[str, Any]] = []
+  for summary in summaries:
+    feed = feed_table_handle.find_one({'summary': summary, 'type': feed_type.value})
+    if feed is None:
+      return None
+    feeds.append(feed)
+  return feeds
+
+def build_prompt_references(
+  prompt: str,
+  feed_table_handle
+) -> Optional[Tuple[List[str], List[str], List[PortfolioHolding]]]:
+  sections = parse_prompt_sections(prompt)
+  holdings = parse_holdings(sections.get('PORTFOLIO HOLDINGS:', []))
+  if holdings is None:
+    return None
+
+  feeds_by_type: Dict[FeedType, List[Dict[str, Any]]] = {}
+  for section, feed_type in SECTION_FEED_TYPES.items():
+    feeds = find_feeds(sections.get(section, []), feed_type, feed_table_handle)
+    if feeds is None:
+      return None
+    feeds_by_type[feed_type] = feeds
+
+  payload: ResultantLLMInputPayload = {
+    'current_portfolio_holdings': holdings,
+    'political_news': [feed_document_to_entry(feed) for feed in feeds_by_type[FeedType.POLITICAL]],
+    'market_news': [feed_document_to_entry(feed) for feed in feeds_by_type[FeedType.MARKET]]
+  }
+  # Records with a full prompt predate template versioning, so they were rendered by news-v1
+  if PROMPT_TEMPLATES[LEGACY_PROMPT_TEMPLATE_VERSION](payload) != prompt:
+    return None
+  return (
+    [feed['title_hash'] for feed in feeds_by_type[FeedType.POLITICAL]],
+    [feed['title_hash'] for feed in feeds_by_type[FeedType.MARKET]],
+    holdings
+  )
+
+def migrate_record(
+  record: Dict[str, Any],
+  feed_table_handle,
+  snapshot_operations: Dict[str, UpdateOne]
+) -> Tuple[Dict[str, Any], Dict[str, Any], bool]:
+  set_fields: Dict[str, Any] = {}
+  unset_fields: Dict[str, Any] = {}
+  referenced = False
+
+  prompt = record.get('prompt')
+  if prompt is not None:
+    references = build_prompt_references(prompt, feed_table_handle)
+    if references is not None:
+      political_title_hashes, market_title_hashes, holdings = references
+      holdings_snapshot_id = None
+      if holdings:
+        snapshot = build_holdings_snapshot(holdings)
+        holdings_snapshot_id = snapshot['_id']
+        snapshot_operations[holdings_snapshot_id] = UpdateOne(
+          {'_id': holdings_snapshot_id},
+          {'$setOnInsert': snapshot},
+          upsert=True
+        )
+      set_fields.update({
+        'prompt_template_version': LEGACY_PROMPT_TEMPLATE_VERSION,
+        'political_title_hashes': political_title_hashes,
+        'market_title_hashes': market_title_hashes,
+        'holdings_snapshot_id': holdings_snapshot_id
+      })
+      referenced = True
+    else:
+      set_fields['prompt_compressed'] = compress_prompt(prompt)
+    unset_fields['prompt'] = ''
+
+  response = record.get('prompt_response')
+  if isinstance(response, str) and 'prompt_response_encoding' not in record:
+    if 'recommendations' not in record:
+      set_fields['recommendations'] = parse_recommendations(response)
+    # The encoding is written even when it stays None so reruns skip the record
+    stored_response, response_encoding = compress_text(response)
+    set_fields['prompt_response'] = stored_response
+    set_fields['prompt_response_encoding'] = response_encoding
+
+  return set_fields, unset_fields, referenced
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description='Convert stored LLM prompts to feed/holdings references and compress large text.')
+  parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+  args = parser.parse_args()
+
+  load_dotenv()
+  configure_logging()
+
+  mongodb_database = MongoDatabase(config=DatabaseConfig(
+    url=os.getenv('MONGODB_URI'),
+    name=os.getenv('MONGODB_NAME')
+  ))
+  feed_table_handle = mongodb_database.get_table_handle('feeds')
+  llm_request_response_handle = mongodb_database.get_table_handle('llm_request_responses')
+  snapshot_handle = mongodb_database.get_table_handle(HOLDINGS_SNAPSHOTS_TABLE)
+
+  counts = {'scanned': 0, 'referenced': 0, 'compressed_prompt': 0, 'updated': 0}
+  record_operations: List[UpdateOne] = []
+  snapshot_operations: Dict[str, UpdateOne] = {}
+
+  def flush() -> None:
+    # Snapshots go first so no converted record points at a missing snapshot
+    if not args.dry_run:
+      if snapshot_operations:
+        snapshot_handle.bulk_write(list(snapshot_operations.values()), ordered=False)
+      if record_operations:
+        llm_request_response_handle.bulk_write(record_operations, ordered=False)
+    snapshot_operations.clear()
+    record_operations.clear()
+
+  legacy_query = {'$or': [
+    {'prompt': {'$exists': True}},
+    {'prompt_response_encoding': {'$exists': False}}
+  ]}
+  try:
+    for record in llm_request_response_handle.find(legacy_query):
+      counts['scanned'] += 1
+      set_fields, unset_fields, referenced = migrate_record(record, feed_table_handle, snapshot_operations)
+      if 'prompt' in unset_fields:
+        counts['referenced' if referenced else 'compressed_prompt'] += 1
+      if not set_fields and not unset_fields:
+        continue
+
+      update: Dict[str, Any] = {}
+      if set_fields:
+        update['$set'] = set_fields
+      if unset_fields:
+        update['$unset'] = unset_fields
+      record_operations.append(UpdateOne({'_id': record['_id']}, update))
+      counts['updated'] += 1
+      if len(record_operations) >= BATCH_SIZE:
+        flush()
+    flush()
+  finally:
+    mongodb_database.close()
+
+  prefix = 'Would update' if args.dry_run else 'Updated'
+  logger.info(
+    f"Scanned {counts['scanned']} records. {prefix} {counts['updated']}: "
+    f"{counts['referenced']} prompts converted to references, "
+    f"{counts['compressed_prompt']} prompts kept as compressed text."
+  )
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,92 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+from typing import Dict, Any, List
+
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers.model_routing import TRIAGE_SYSTEM_PROMPT
+
+# OpenAI-compatible /v1/chat/completions stub for benchmarking the triage and
+# analysis tiers without network calls. Point LLM_BASE_URL at http://<host>:<port>/v1.
+
+app = Flask(__name__)
+settings: Dict[str, Any] = {}
+
+def estimate_tokens(text: str) -> int:
+  return max(1, len(text) // 4)
+
+def triage_response(user_prompt: str) -> str:
+  item_numbers = [int(number) for number in re.findall(r'^(\d+)\. ', user_prompt, re.MULTILINE)]
+  actionable = [number for number in item_numbers if random.random() < settings['actionable_ratio']]
+  return json.dumps(actionable)
+
+def analysis_response(user_prompt: str) -> str:
+  # One recommendation per news section, quoting its first item as the prompt requires
+  recommendations: List[Dict[str, Any]] = []
+  for section, segment in (('POLITICAL NEWS:', 'POLITICAL_NEWS'), ('MARKET NEWS:', 'MARKET_NEWS')):
+    match = re.search(rf'^{section}\n\n1\. (.+)$', user_prompt, re.MULTILINE)
+    if match:
+      recommendations.append({
+        'news_summary_referenced': match.group(1),
+        'news_summary_segment': segment,
+        'side': 'BUY',
+        'trading_idea': 'BUY: Stub asset at entry price ₹100, exit at ₹110. Stub rationale.',
+        'confidence_on_trading_idea': 5
+      })
+  return json.dumps(recommendations)
+
+@app.route('/v1/chat/completions', methods=['POST'])
+def chat_completions():
+  body = request.get_json(force=True)
+  messages = body.get('messages', [])
+  system_prompt = next((message['content'] for message in messages if message['role'] == 'system'), '')
+  user_prompt = next((message['content'] for message in messages if message['role'] == 'user'), '')
+
+  is_triage = system_prompt == TRIAGE_SYSTEM_PROMPT
+  time.sleep((settings['triage_latency_ms'] if is_triage else settings['analysis_latency_ms']) / 1000)
+  content = triage_response(user_prompt) if is_triage else analysis_response(user_prompt)
+
+  prompt_tokens = estimate_tokens(system_prompt + user_prompt)
+  completion_tokens = estimate_tokens(content)
+  return jsonify({
+    'id': f'chatcmpl-stub-{int(time.time() * 1000)}',
+    'object': 'chat.completion',
+    'created': int(time.time()),
+    'model': body.get('model', 'stub'),
+    'choices': [{
+      'index': 0,
+      'message': {'role': 'assistant', 'content': content},
+      'finish_reason': 'stop'
+    }],
+    'usage': {
+      'prompt_tokens': prompt_tokens,
+      'completion_tokens': completion_tokens,
+      'total_tokens': prompt_tokens + completion_tokens
+    }
+  })
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description='Serve a local OpenAI-compatible chat completions stub.')
+  parser.add_argument('--host', default='127.0.0.1')
+  parser.add_argument('--port', type=int, default=8001)
+  parser.add_argument('--triage-latency-ms', type=float, default=150.0, help='Simulated latency of the triage model')
+  parser.add_argument('--analysis-latency-ms', type=float, default=1500.0, help='Simulated latency of the analysis model')
+  parser.add_argument('--actionable-ratio', type=float, default=0.3, help='Share of news items triage marks actionable')
+  args = parser.parse_args()
+
+  settings.update(
+    triage_latency_ms=args.triage_latency_ms,
+    analysis_latency_ms=args.analysis_latency_ms,
+    actionable_ratio=args.actionable_ratio
+  )
+  app.run(host=args.host, port=args.port, threaded=True)
+
+if __name__ == '__main__':
+  main()
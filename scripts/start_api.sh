@@ -1,6 +1,7 @@
 #!/bin/bash
 
 # Start the Flask API server
+# Set API_SERVER_MODE=production to serve with gunicorn (multi-worker, see gunicorn.conf.py)
 # Set FLASK_DEBUG=true for development, false for production
 # Set FLASK_PORT to change the port (default: 5000)
 
@@ -12,5 +13,8 @@ if [ -d "venv" ]; then
 fi
 
 # Run the API
-python api.py
+if [ "${API_SERVER_MODE:-development}" = "production" ]; then
+  exec gunicorn -c gunicorn.conf.py api:app
+fi
 
+python api.py
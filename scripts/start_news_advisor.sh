@@ -1,3 +1,4 @@
 #!/bin/bash
 
-python -m main
+python -m cli migrate
+python -m cli daemon